@@ -3,8 +3,14 @@ Application factory + bootstrap (what used to be at the bottom of your big file)
 """
 from flask import Flask
 from config import Config
-from extensions import init_extensions, db
+from extensions import init_extensions
 from utils.error_handlers import register_error_handlers
+from utils.query_stats import register_query_stats
+from utils.slow_queries import register_slow_query_log
+from utils.rating_coalescer import register_rating_coalescer
+from utils.single_writer import register_single_writer
+from utils.commands import register_commands
+from utils.schema import ensure_schema
 from routes import register_blueprints
 
 
@@ -21,9 +27,22 @@ def create_app():
     # Error handlers
     register_error_handlers(app)
 
-    # Create tables *once*
+    # Per-request SQL statistics (debug / staging only) and the opt-in slow-query log
+    register_query_stats(app)
+    register_slow_query_log(app)
+
+    # Opt-in merging of rapid rating updates
+    register_rating_coalescer(app)
+
+    # Opt-in single writer thread with group commits for the list write routes
+    register_single_writer(app)
+
+    # CLI commands
+    register_commands(app)
+
+    # Create / upgrade tables only when the models changed since the last boot
     with app.app_context():
-        db.create_all()
+        ensure_schema()
 
     return app
 
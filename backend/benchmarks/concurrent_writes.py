@@ -0,0 +1,175 @@
+"""
+Concurrent list writes with and without the single-writer queue.
+
+    python benchmarks/concurrent_writes.py --threads 12 --requests 150
+
+Seeds a throwaway SQLite database with one user and list per thread, then
+each thread hammers its own list through the real routes: mostly rating
+updates (PUT /lists/<id>/media/<id>) plus some new titles
+(POST /lists/<id>/media). This is run in three modes:
+
+  direct        – every request commits on its own thread (the default)
+  direct + WAL  – the same with the journal in WAL mode
+  single writer – SINGLE_WRITER: requests are group-committed by one thread
+
+and reports throughput, latency percentiles and how many requests failed
+(and of those, how many with "database is locked").
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_dir = tempfile.mkdtemp(prefix="whirlwatch-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.pop("DATABASE_READ_URL", None)
+os.environ["SINGLE_WRITER"] = "false"
+os.environ["RATING_COALESCE_MS"] = "0"
+# Each thread holds a connection; keep the pool from being the bottleneck
+os.environ.setdefault("DB_POOL_SIZE", "64")
+for _key in ("JWT_SECRET_KEY", "TMDB_API_KEY", "MAIL_USERNAME", "MAIL_PASSWORD"):
+    os.environ.setdefault(_key, "benchmark-secret-key-of-sufficient-length")
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+from models import Media, MediaInList, MediaList, User, UserMediaRating  # noqa: E402
+from utils.single_writer import register_single_writer, single_writer  # noqa: E402
+
+MODES = (
+    ("direct", "delete", False),
+    ("direct + WAL", "wal", False),
+    ("single writer", "wal", True),
+)
+
+
+def seed(args):
+    users = [
+        User(username=f"user{i}", email=f"user{i}@example.com", password_hash="x",
+             email_verified=True, list_count=1)
+        for i in range(args.threads)
+    ]
+    media = [Media(tmdb_id=i, media_type="movie") for i in range(args.items)]
+    db.session.add_all(users + media)
+    db.session.flush()
+
+    workers = []
+    for i, user in enumerate(users):
+        lst = MediaList(name=f"list{i}", owner_id=user.id, share_code=f"{i:08d}", item_count=args.items)
+        db.session.add(lst)
+        db.session.flush()
+        entries = [MediaInList(list_id=lst.id, media_id=m.id, added_by_id=user.id) for m in media]
+        db.session.add_all(entries)
+        db.session.add_all(UserMediaRating(user_id=user.id, media_id=m.id) for m in media)
+        db.session.flush()
+        workers.append({
+            "token": create_access_token(identity=user.id),
+            "list_id": lst.id,
+            "entry_ids": [e.id for e in entries],
+            "next_tmdb_id": 100000 * (i + 1),
+        })
+    db.session.commit()
+    return workers
+
+
+def worker(app, args, state, barrier, latencies, failures, seed):
+    rng = random.Random(seed)
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {state['token']}"}
+    list_id = state["list_id"]
+    barrier.wait()
+    for _ in range(args.requests):
+        started = time.perf_counter()
+        if rng.random() < args.add_ratio:
+            state["next_tmdb_id"] += 1
+            response = client.post(f"/api/lists/{list_id}/media", headers=headers,
+                                   json={"tmdb_id": state["next_tmdb_id"], "media_type": "movie"})
+        else:
+            entry_id = rng.choice(state["entry_ids"])
+            response = client.put(f"/api/lists/{list_id}/media/{entry_id}", headers=headers,
+                                  json={"watch_status": "completed", "rating": rng.randint(1, 10)})
+        latencies.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            failures.append(response.get_data(as_text=True))
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run(app, args, mode, journal_mode, use_writer):
+    with app.app_context():
+        db.drop_all()
+        db.session.execute(text(f"PRAGMA journal_mode={journal_mode}"))
+        db.create_all()
+        workers = seed(args)
+        db.session.remove()
+        db.engine.dispose()
+
+    if use_writer:
+        app.config["SINGLE_WRITER"] = True
+        register_single_writer(app)
+    else:
+        single_writer.enabled = False
+    batches_before = single_writer.batches
+
+    latencies, failures = [], []
+    barrier = threading.Barrier(args.threads + 1)
+    threads = [
+        threading.Thread(target=worker, args=(app, args, state, barrier, latencies, failures, args.seed + i))
+        for i, state in enumerate(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ok = len(latencies) - len(failures)
+    batches = single_writer.batches - batches_before
+    return {
+        "mode": mode,
+        "ok_per_sec": ok / elapsed,
+        "p50_ms": 1000 * percentile(latencies, 50),
+        "p95_ms": 1000 * percentile(latencies, 95),
+        "p99_ms": 1000 * percentile(latencies, 99),
+        "max_ms": 1000 * latencies[-1],
+        "failed": len(failures),
+        "locked": sum("locked" in body for body in failures),
+        "per_commit": ok / batches if batches else 1.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=12)
+    parser.add_argument("--requests", type=int, default=150, help="requests per thread")
+    parser.add_argument("--items", type=int, default=50, help="titles per list")
+    parser.add_argument("--add-ratio", type=float, default=0.2, help="share of requests that add a title")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    app = create_app()
+    results = [run(app, args, *mode) for mode in MODES]
+    shutil.rmtree(_db_dir, ignore_errors=True)
+
+    columns = list(results[0])
+    print("  ".join(f"{c:>14}" for c in columns))
+    for result in results:
+        print("  ".join(f"{v:>14.1f}" if isinstance(v, float) else f"{v:>14}" for v in result.values()))
+
+
+if __name__ == "__main__":
+    main()
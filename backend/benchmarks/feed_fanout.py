@@ -0,0 +1,152 @@
+"""
+Compare the collaborators feed with and without fan-out on write.
+
+    python benchmarks/feed_fanout.py --users 200 --lists 60 --events 3000
+
+Seeds a throwaway SQLite database where one "heavy" user belongs to every
+list, then for each mode (FEED_FANOUT off / on) measures:
+
+  write  – time, SQL statements and rows written per recorded event
+  read   – time and SQL statements to fetch the heavy user's first page
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_dir = tempfile.mkdtemp(prefix="whirlwatch-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.pop("DATABASE_READ_URL", None)
+for _key in ("JWT_SECRET_KEY", "TMDB_API_KEY", "MAIL_USERNAME", "MAIL_PASSWORD"):
+    os.environ.setdefault(_key, "benchmark")
+
+from sqlalchemy import event  # noqa: E402
+
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+from models import ActivityEvent, Media, MediaInList, MediaList, SharedList, TimelineEntry, User  # noqa: E402
+from utils.activity import collaborator_events_query, record_added  # noqa: E402
+from utils.pagination import DEFAULT_PAGE_SIZE, iter_keyset  # noqa: E402
+from config import MAX_USERS_PER_LIST  # noqa: E402
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def seed(args, rng):
+    users = [
+        User(username=f"user{i}", email=f"user{i}@example.com", password_hash="x", email_verified=True)
+        for i in range(args.users)
+    ]
+    db.session.add_all(users)
+    db.session.add_all(Media(tmdb_id=i, media_type="movie") for i in range(args.events))
+    db.session.flush()
+
+    heavy = users[0]
+    lists = []
+    for i in range(args.lists):
+        owner = heavy if i % 2 == 0 else rng.choice(users[1:])
+        lst = MediaList(name=f"list{i}", owner_id=owner.id, share_code=f"{i:08d}")
+        db.session.add(lst)
+        db.session.flush()
+        others = rng.sample([u for u in users if u.id not in (owner.id, heavy.id)], MAX_USERS_PER_LIST - 2)
+        members = others if owner is heavy else others + [heavy]
+        db.session.add_all(SharedList(list_id=lst.id, user_id=u.id) for u in members)
+        lists.append((lst, [owner] + members))
+    db.session.commit()
+    return heavy, lists
+
+
+def run(app, args, fanout):
+    rng = random.Random(args.seed)
+    app.config["FEED_FANOUT"] = fanout
+    app.config["FEED_TIMELINE_MAX"] = args.timeline_max
+
+    db.drop_all()
+    db.create_all()
+    heavy, lists = seed(args, rng)
+    counter = StatementCounter(db.engine)
+
+    # Writes: one committed event per "request", as the routes do
+    start_ts = datetime.utcnow() - timedelta(days=1)
+    counter.count = 0
+    started = time.perf_counter()
+    for i in range(args.events):
+        lst, members = rng.choice(lists)
+        entry = MediaInList(
+            list_id=lst.id,
+            media_id=i + 1,
+            added_by_id=rng.choice(members).id,
+            added_date=start_ts + timedelta(seconds=i),
+        )
+        db.session.add(entry)
+        db.session.flush()
+        record_added(entry)
+        db.session.commit()
+    write_secs = time.perf_counter() - started
+    write_statements = counter.count
+    events = db.session.query(ActivityEvent).count()
+    timeline_rows = db.session.query(TimelineEntry).count()
+
+    # Reads: the heavy user's first page
+    heavy_id = heavy.id
+    counter.count = 0
+    started = time.perf_counter()
+    for _ in range(args.reads):
+        query, sort_col, id_col = collaborator_events_query(heavy_id)
+        page = []
+        for row, _key in iter_keyset(query, sort_col, id_col, batch_size=DEFAULT_PAGE_SIZE):
+            page.append(row)
+            if len(page) == DEFAULT_PAGE_SIZE:
+                break
+        db.session.rollback()
+    read_secs = time.perf_counter() - started
+
+    return {
+        "mode": "fan-out" if fanout else "event log",
+        "write_ms_per_event": 1000 * write_secs / args.events,
+        "statements_per_event": write_statements / args.events,
+        "rows_per_event": (events + timeline_rows) / args.events,
+        "read_ms_per_page": 1000 * read_secs / args.reads,
+        "statements_per_page": counter.count / args.reads,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--lists", type=int, default=60)
+    parser.add_argument("--events", type=int, default=3000)
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--timeline-max", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    app = create_app()
+    results = []
+    with app.app_context():
+        for fanout in (False, True):
+            results.append(run(app, args, fanout))
+        db.engine.dispose()
+    shutil.rmtree(_db_dir, ignore_errors=True)
+
+    columns = list(results[0])
+    print("  ".join(f"{c:>20}" for c in columns))
+    for result in results:
+        print("  ".join(f"{v:>20.2f}" if isinstance(v, float) else f"{v:>20}" for v in result.values()))
+
+
+if __name__ == "__main__":
+    main()
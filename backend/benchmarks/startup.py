@@ -0,0 +1,76 @@
+"""
+Measure cold start of a worker: interpreter start, imports and create_app().
+
+    python benchmarks/startup.py --runs 10
+
+Every run is a fresh interpreter. "first boot" starts against an empty
+database (full DDL); "warm boot" starts against a database whose schema is
+already current, which is what an autoscaled worker normally sees.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BOOT_SCRIPT = """
+import time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app()
+finished = time.perf_counter()
+print(imported - started, finished - imported)
+"""
+
+
+def boot(env):
+    output = subprocess.run(
+        [sys.executable, "-c", BOOT_SCRIPT],
+        cwd=BACKEND, env=env, check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return float(output[0]) * 1000, float(output[1]) * 1000
+
+
+def summarise(label, samples):
+    imports = [s[0] for s in samples]
+    create = [s[1] for s in samples]
+    print(
+        f"{label:>12}  imports {statistics.median(imports):7.1f}ms  "
+        f"create_app {statistics.median(create):7.1f}ms  "
+        f"total {statistics.median(i + c for i, c in samples):7.1f}ms  (median of {len(samples)})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix="whirlwatch-startup-")
+    db_path = os.path.join(db_dir, "startup.db")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}")
+    env.pop("DATABASE_READ_URL", None)
+    for key in ("JWT_SECRET_KEY", "TMDB_API_KEY", "MAIL_USERNAME", "MAIL_PASSWORD"):
+        env.setdefault(key, "benchmark")
+
+    try:
+        first = []
+        for _ in range(args.runs):
+            if os.path.exists(db_path):
+                os.remove(db_path)
+            first.append(boot(env))
+        warm = [boot(env) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+    summarise("first boot", first)
+    summarise("warm boot", warm)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,13 +8,83 @@ load_dotenv()
 # Constants that several blueprints need
 MAX_USERS_PER_LIST = 8
 MAX_LISTS_PER_USER = 10
+# How long an emailed verification / password-reset code stays valid
+VERIFICATION_CODE_TTL = timedelta(minutes=15)
+
+
+def _engine_options():
+    """Build SQLALCHEMY_ENGINE_OPTIONS from DB_POOL_* environment variables."""
+    options = {}
+    for env_key, option, cast in (
+        ('DB_POOL_SIZE', 'pool_size', int),
+        ('DB_MAX_OVERFLOW', 'max_overflow', int),
+        ('DB_POOL_RECYCLE', 'pool_recycle', int),
+        ('DB_POOL_TIMEOUT', 'pool_timeout', int),
+    ):
+        if os.getenv(env_key):
+            options[option] = cast(os.getenv(env_key))
+    if os.getenv('DB_POOL_PRE_PING'):
+        options['pool_pre_ping'] = os.getenv('DB_POOL_PRE_PING').lower() in ('1', 'true', 'yes')
+    return options
 
 
 class Config:
     """Base Flask configuration – identical to your monolith version."""
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///whirlwatch.db'
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///whirlwatch.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Connection pool – only the settings present in the environment are passed on
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options()
+
+    # Optional read-only replica; @read_only views send their SELECTs here.
+    # Locally this can be a second SQLite file that is periodically copied from the primary.
+    DATABASE_READ_URL = os.getenv('DATABASE_READ_URL')
+    SQLALCHEMY_BINDS = {'replica': {'url': DATABASE_READ_URL, **SQLALCHEMY_ENGINE_OPTIONS}} if DATABASE_READ_URL else {}
+
+    # Fan-out-on-write collaborators feed (see utils.activity). When enabled every
+    # event is copied into each list member's timeline, capped at FEED_TIMELINE_MAX.
+    FEED_FANOUT = os.getenv('FEED_FANOUT', 'false').lower() in ('1', 'true', 'yes')
+    FEED_TIMELINE_MAX = int(os.getenv('FEED_TIMELINE_MAX', 500))
+
+    # Per-request SQL statistics (see utils.query_stats). Always on when the app
+    # runs in debug mode; set QUERY_STATS=true to enable it on staging.
+    QUERY_STATS = os.getenv('QUERY_STATS', 'false').lower() in ('1', 'true', 'yes')
+    # A statement shape repeated this many times in one request is reported as a probable N+1
+    QUERY_STATS_N_PLUS_ONE_THRESHOLD = int(os.getenv('QUERY_STATS_N_PLUS_ONE_THRESHOLD', 5))
+
+    # Slow-query recorder (see utils.slow_queries) – off unless SLOW_QUERY_MS is set
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS')) if os.getenv('SLOW_QUERY_MS') else None
+    SLOW_QUERY_TOP_N = int(os.getenv('SLOW_QUERY_TOP_N', 50))
+
+    # Verification codes are purged this long after they expire, by the
+    # purge-verification-codes command (see utils.maintenance)
+    VERIFICATION_CODE_RETENTION_HOURS = int(os.getenv('VERIFICATION_CODE_RETENTION_HOURS', 24))
+
+    # Delta-sync change log rows are kept this long (see utils.changes); clients
+    # with an older cursor are told to reload the whole list
+    LIST_CHANGES_RETENTION_DAYS = int(os.getenv('LIST_CHANGES_RETENTION_DAYS', 30))
+
+    # Merge rating changes to the same title arriving within this many ms into
+    # one commit (see utils.rating_coalescer); 0 commits every change at once
+    RATING_COALESCE_MS = float(os.getenv('RATING_COALESCE_MS', 0))
+    # Times a merged batch is retried after a transient error ("database is
+    # locked") before its changes are dropped and logged
+    RATING_COALESCE_RETRIES = int(os.getenv('RATING_COALESCE_RETRIES', 5))
+
+    # Run the list write routes on one writer thread that group-commits whatever
+    # queued up meanwhile (see utils.single_writer); also switches SQLite to WAL
+    SINGLE_WRITER = os.getenv('SINGLE_WRITER', 'false').lower() in ('1', 'true', 'yes')
+    SINGLE_WRITER_BATCH_MAX = int(os.getenv('SINGLE_WRITER_BATCH_MAX', 64))
+
+    # Rankings: each title's average is blended with the list-wide mean as if it
+    # had RANKING_PRIOR_WEIGHT extra ratings at that mean (Bayesian average)
+    RANKING_PRIOR_WEIGHT = float(os.getenv('RANKING_PRIOR_WEIGHT', 3))
+
+    # Online SQLite backups (see utils.maintenance); BACKUP_DIR defaults to <instance>/backups
+    BACKUP_DIR = os.getenv('BACKUP_DIR')
+    BACKUP_PAGES_PER_STEP = int(os.getenv('BACKUP_PAGES_PER_STEP', 256))
+    BACKUP_STEP_SLEEP = float(os.getenv('BACKUP_STEP_SLEEP', 0.05))
+
     # Secrets & API keys
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
     TMDB_API_KEY = os.getenv('TMDB_API_KEY')
@@ -34,5 +104,8 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=30)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=60)
 
+    # Seconds a worker may keep acting on a cached is_privilege after an admin changes it
+    PRIVILEGE_CACHE_TTL = int(os.getenv('PRIVILEGE_CACHE_TTL', 30))
+
     # Rate-limit constants (used in utils.helpers)
     ENDPOINT_LIMIT_DEFAULT = 300  # seconds
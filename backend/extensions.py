@@ -2,31 +2,82 @@
 All 3rd-party extensions live here so we never create circular imports.
 """
 import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from flask_jwt_extended import JWTManager, get_jwt_identity
+from flask_jwt_extended import JWTManager, get_jwt, get_jwt_identity
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from utils.db_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 jwt = JWTManager()
 cors = CORS()  # resources will be configured in app.create_app()
 
+# Per-process copy of User.is_privilege / privilege_changed_at, so the rate-limit
+# key needs at most one query per user every PRIVILEGE_CACHE_TTL seconds.
+# user_id -> (is_privilege, changed_at timestamp or None, fetched_at)
+_privilege_cache = {}
+
+
+@jwt.additional_claims_loader
+def add_privilege_claim(identity):
+    """Stamp every access token with the user's privilege flag."""
+    # Import here to avoid circular imports
+    from models import User
+
+    user = db.session.get(User, identity)
+    return {"is_privilege": bool(user and user.is_privilege)}
+
+
+def record_privilege_change(user):
+    """Stamp a privilege change so tokens issued before it are superseded (caller commits)."""
+    user.privilege_changed_at = datetime.utcnow()
+    _privilege_cache.pop(user.id, None)
+
+
+def _current_privilege(user_id):
+    """``(is_privilege, changed_at)`` from the database, cached for PRIVILEGE_CACHE_TTL."""
+    from models import User
+
+    now = time.monotonic()
+    cached = _privilege_cache.get(user_id)
+    if cached is None or now - cached[2] > current_app.config["PRIVILEGE_CACHE_TTL"]:
+        row = db.session.query(User.is_privilege, User.privilege_changed_at).filter(User.id == user_id).first()
+        changed_at = None
+        if row and row.privilege_changed_at:
+            changed_at = row.privilege_changed_at.replace(tzinfo=timezone.utc).timestamp()
+        cached = _privilege_cache[user_id] = (bool(row and row.is_privilege), changed_at, now)
+    return cached[0], cached[1]
+
+
+def is_privileged_request():
+    """
+    Privilege from the verified JWT, unless an admin changed it after the
+    token was issued – then the stored value wins, on every worker and
+    across restarts (within PRIVILEGE_CACHE_TTL).
+    """
+    claims = get_jwt()
+    is_privilege, changed_at = _current_privilege(claims.get("sub"))
+    if changed_at is not None and claims.get("iat", 0) <= changed_at:
+        return is_privilege
+    return bool(claims.get("is_privilege", False))
+
+
 # Custom key function that exempts privileged users from rate limits
 def get_rate_limit_key():
     try:
         # Get the current user's ID
         current_user_id = get_jwt_identity()
         
-        if current_user_id:
-            # Import here to avoid circular imports
-            from models import User
-            
-            # Check if the user has privilege status in the database
-            user = User.query.get(current_user_id)
-            if user and user.is_privilege:
-                # Return None for privileged users to bypass rate limits completely
-                return None
+        if current_user_id and is_privileged_request():
+            # Return None for privileged users to bypass rate limits completely
+            return None
         
         # For regular users, use IP + user ID to prevent sharing rate limits
         return f"{get_remote_address()}:{current_user_id}" if current_user_id else get_remote_address()
@@ -37,8 +88,18 @@ def get_rate_limit_key():
 # In-memory limiter with custom key function
 limiter = Limiter(key_func=get_rate_limit_key, storage_uri="memory://")
 
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite ships with FK enforcement off; ON DELETE CASCADE needs it per connection."""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
 def init_extensions(app):
     """Bind each extension to the freshly created app."""
+    if not event.contains(Engine, "connect", enable_sqlite_foreign_keys):
+        event.listen(Engine, "connect", enable_sqlite_foreign_keys)
     db.init_app(app)
     jwt.init_app(app)
     cors.init_app(
@@ -14,9 +14,17 @@ class User(db.Model):
     email_verified = db.Column(db.Boolean, default=False)
     is_admin = db.Column(db.Boolean, default=False)
     is_privilege = db.Column(db.Boolean, default=False)
-    lists = db.relationship('MediaList', backref='owner', lazy=True)
+    # When an admin last changed is_privilege; tokens issued before it lose their claim
+    privilege_changed_at = db.Column(db.DateTime, nullable=True)
+    # Denormalised: owned + shared lists (kept in sync by utils.helpers)
+    list_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    # Child rows are removed by ON DELETE CASCADE; passive_deletes stops the
+    # ORM loading them just to delete them again
+    lists = db.relationship('MediaList', backref='owner', lazy=True,
+                            cascade='all, delete', passive_deletes=True)
     # Add relationship to user media ratings
-    ratings = db.relationship('UserMediaRating', backref='user', lazy=True)
+    ratings = db.relationship('UserMediaRating', backref='user', lazy=True,
+                              cascade='all, delete', passive_deletes=True)
 
 
 # New model for storing unique media items
@@ -39,35 +47,54 @@ class MediaList(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), nullable=False)
     description = db.Column(db.String(100))
-    owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
     share_code = db.Column(db.String(8), unique=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     last_updated = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    media_items = db.relationship('MediaInList', backref='media_list', lazy=True)
-    shared_with = db.relationship('SharedList', backref='media_list', lazy=True)
+    # Denormalised: owner + shared users, and MediaInList rows (kept in sync by utils.helpers)
+    member_count = db.Column(db.Integer, default=1, server_default="1", nullable=False)
+    item_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    # Bumped whenever items, ratings or membership change; keys cached list stats
+    version = db.Column(db.Integer, default=1, server_default="1", nullable=False)
+    # Highest ListChange id purged for this list; older sync cursors must reload
+    changes_purged_id = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    media_items = db.relationship('MediaInList', backref='media_list', lazy=True,
+                                  cascade='all, delete', passive_deletes=True)
+    shared_with = db.relationship('SharedList', backref='media_list', lazy=True,
+                                  cascade='all, delete', passive_deletes=True)
+
+    # AUTOINCREMENT: a deleted list's id is never handed to a new list, so
+    # caches and ETags keyed by (id, version) can't serve one list as another
+    __table_args__ = ({'sqlite_autoincrement': True},)
 
 
 # Modified to remove rating from this model
 class MediaInList(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    list_id = db.Column(db.Integer, db.ForeignKey('media_list.id'), nullable=False)
+    list_id = db.Column(db.Integer, db.ForeignKey('media_list.id', ondelete='CASCADE'), nullable=False)
     media_id = db.Column(db.Integer, db.ForeignKey('media.id'), nullable=False)
     added_date = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     last_updated = db.Column(db.DateTime, default=datetime.utcnow,
                              onupdate=datetime.utcnow, nullable=False)
-    added_by_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    added_by_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
 
-    added_by = db.relationship('User', backref='added_media_items')
+    added_by = db.relationship('User', backref=db.backref(
+        'added_media_items', cascade='all, delete', passive_deletes=True
+    ))
 
     __table_args__ = (
         db.UniqueConstraint('list_id', 'media_id', name='uq_list_media'),
+        # Reverse lookups by title (media GC, "which lists hold this")
+        db.Index('ix_media_in_list_media', 'media_id'),
+        # Newest-first reads of a list's entries (/user/media pages)
+        db.Index('ix_media_in_list_updated', 'list_id', 'last_updated', 'id'),
     )
 
 
 # New model for personal user ratings
 class UserMediaRating(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
     media_id = db.Column(db.Integer, db.ForeignKey('media.id'), nullable=False)
     watch_status = db.Column(db.String(20), default='not_watched', nullable=False)
     rating = db.Column(db.Integer, nullable=True)
@@ -77,19 +104,99 @@ class UserMediaRating(db.Model):
     
     __table_args__ = (
         db.UniqueConstraint('user_id', 'media_id', name='uq_user_media_rating'),
+        # Per-title averages and media GC
+        db.Index('ix_rating_media', 'media_id'),
+        # A user's ratings newest first (/user/ratings pages)
+        db.Index('ix_rating_user_updated', 'user_id', 'updated_at', 'id'),
     )
 
 
 class SharedList(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    list_id = db.Column(db.Integer, db.ForeignKey('media_list.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    list_id = db.Column(db.Integer, db.ForeignKey('media_list.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+
+    __table_args__ = (
+        # A user's shared lists (membership checks, feeds)
+        db.Index('ix_shared_list_user', 'user_id'),
+        # A list's members (collaborator lookups, cascades on list delete)
+        db.Index('ix_shared_list_list', 'list_id'),
+    )
 
 
 class VerificationCode(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
     code = db.Column(db.String(6), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     purpose = db.Column(db.String(20), nullable=False)  # 'password_reset', 'email_verification'
     used = db.Column(db.Boolean, default=False)
+
+    __table_args__ = (
+        # Matches the verify lookup: equality on all four, newest first
+        db.Index('ix_verification_lookup', 'user_id', 'purpose', 'code', 'used', 'created_at'),
+        # Range scan for the expiry purge
+        db.Index('ix_verification_created', 'created_at'),
+    )
+
+
+# Append-only log of list activity; the feeds read from this
+class ActivityEvent(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    list_id = db.Column(db.Integer, db.ForeignKey('media_list.id', ondelete='CASCADE'), nullable=False)
+    media_in_list_id = db.Column(db.Integer, db.ForeignKey('media_in_list.id', ondelete='CASCADE'), nullable=False)
+    media_id = db.Column(db.Integer, db.ForeignKey('media.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    event_type = db.Column(db.String(10), nullable=False)  # 'added' or 'status'
+    watch_status = db.Column(db.String(20), nullable=False)
+    rating = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_activity_list_created', 'list_id', 'created_at'),
+        db.Index('ix_activity_media', 'media_id'),
+        # The self feed: one user's events newest first, whatever the list
+        db.Index('ix_activity_user_created', 'user_id', 'created_at', 'id'),
+    )
+
+
+# Per-user copy of collaborators' events, written at event time when
+# FEED_FANOUT is enabled so the collaborators feed is a single-key read
+class TimelineEntry(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey('activity_event.id', ondelete='CASCADE'), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_timeline_user_created', 'user_id', 'created_at', 'id'),
+        db.UniqueConstraint('user_id', 'event_id', name='uq_timeline_user_event'),
+    )
+
+
+# Per-list log of which entries / members changed; GET /lists/<id>/changes
+# reads the rows after a client's cursor and serves their current state.
+# AUTOINCREMENT keeps ids rising after a purge empties the table, since
+# cursors and MediaList.changes_purged_id compare against them
+class ListChange(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    list_id = db.Column(db.Integer, db.ForeignKey('media_list.id', ondelete='CASCADE'), nullable=False)
+    kind = db.Column(db.String(10), nullable=False)  # 'item' or 'member'
+    # MediaInList.id or User.id; no FK, the row outlives what it names
+    ref_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_list_change_list', 'list_id', 'id'),
+        # Range scan for the retention purge
+        db.Index('ix_list_change_created', 'created_at'),
+        {'sqlite_autoincrement': True},
+    )
+
+
+# Fingerprint of the models the database schema was last brought up to date
+# with; lets start-up skip DDL entirely when nothing has changed
+class SchemaVersion(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -1,7 +1,9 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import User
-from extensions import db
+from extensions import db, record_privilege_change
+from utils.slow_queries import slow_query_log
+from utils.maintenance import backup_database
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
@@ -52,6 +54,8 @@ def update_user_privilege(user_id):
         return jsonify({"error": "User not found"}), 404
     
     user.is_privilege = is_privilege
+    # Existing tokens carry the old claim – supersede it until they are reissued
+    record_privilege_change(user)
     db.session.commit()
     
     return jsonify({
@@ -61,4 +65,42 @@ def update_user_privilege(user_id):
             "username": user.username,
             "is_privilege": user.is_privilege
         }
-    }), 200
\ No newline at end of file
+    }), 200
+
+@admin_bp.route('/slow-queries', methods=['GET', 'DELETE'])
+@jwt_required()
+def slow_queries():
+    current_user_id = get_jwt_identity()
+    
+    # Check if user is admin
+    if not is_admin(current_user_id):
+        return jsonify({"error": "Unauthorized access"}), 403
+    
+    if request.method == 'DELETE':
+        slow_query_log.clear()
+        return jsonify({"message": "Slow query log cleared"}), 200
+    
+    return jsonify({
+        "enabled": current_app.config.get("SLOW_QUERY_MS") is not None,
+        "threshold_ms": current_app.config.get("SLOW_QUERY_MS"),
+        "queries": slow_query_log.snapshot()
+    }), 200
+
+@admin_bp.route('/backup', methods=['POST'])
+@jwt_required()
+def backup():
+    current_user_id = get_jwt_identity()
+    
+    # Check if user is admin
+    if not is_admin(current_user_id):
+        return jsonify({"error": "Unauthorized access"}), 403
+    
+    try:
+        result = backup_database()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Backup failed: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+    
+    return jsonify({"message": "Backup completed", "backup": result}), 200
@@ -2,12 +2,13 @@
 Blueprint dedicated to verifying / resending email codes.
 """
 import secrets
-from datetime import datetime, timedelta
+from datetime import datetime
 from flask import Blueprint, request, jsonify
 from werkzeug.exceptions import BadRequest
 from extensions import db, limiter
 from flask_jwt_extended import create_access_token, create_refresh_token
 from models import User, VerificationCode
+from config import VERIFICATION_CODE_TTL
 from utils.email_utils import send_verification_email
 
 email_verification_bp = Blueprint(
@@ -45,7 +46,7 @@ def verify_email():
         if not verification:
             raise BadRequest("Invalid verification code")
 
-        if datetime.utcnow() - verification.created_at > timedelta(minutes=15):
+        if datetime.utcnow() - verification.created_at > VERIFICATION_CODE_TTL:
             raise BadRequest("Verification code has expired")
 
         verification.used = True
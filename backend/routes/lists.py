@@ -2,12 +2,12 @@
 All list, shared-list, and media-in-list operations.
 Updated to support personal user ratings.
 """
-import random, string, requests
+import random, string
 from datetime import datetime
 from flask import Blueprint, request, jsonify, current_app
 from werkzeug.exceptions import BadRequest, Forbidden, NotFound
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import func
+from sqlalchemy import func, or_
 from extensions import db, limiter
 from models import (
     MediaList,
@@ -16,10 +16,17 @@ from models import (
     User,
     Media,
     UserMediaRating,
+    ActivityEvent,
 )
 from utils.helpers import (
-    get_list_user_count,
+    lazy_import,
     get_user_list_count,
+    adjust_list_counters,
+    adjust_user_list_counts,
+    bump_list_versions,
+    list_etag,
+    not_modified,
+    with_etag,
 )
 from utils.ratings import (
     get_or_create_media,
@@ -28,15 +35,43 @@ from utils.ratings import (
     get_average_rating,
     get_user_ratings_for_list,
     get_all_ratings_for_media_in_list,
-    clean_orphaned_ratings,
+    clean_orphaned_ratings_bulk,
+    create_missing_ratings,
+    drop_rating_distribution,
+    list_member_ids_query,
+    list_rankings,
+    get_rating_distribution,
 )
+from utils.lookups import find_rating, find_list_entry, get_username
+from utils.access import (
+    get_accessible_list_ids,
+    can_view,
+    is_list_shared_with,
+    invalidate_list_membership,
+)
+from utils.activity import (
+    record_added,
+    record_status,
+    delete_activity,
+    seed_timeline,
+    drop_list_from_timeline,
+)
+from utils.changes import ITEM, record_change, record_member_change, changes_cursor, read_changes
+from utils.db_routing import read_only
+from utils.rating_coalescer import rating_coalescer
+from utils.single_writer import write_unit
+from utils.pagination import get_page_limit, get_page_cursor, encode_cursor, decode_cursor, iter_keyset
 from config import MAX_USERS_PER_LIST, MAX_LISTS_PER_USER
 
+# Only needed once a request hits TMDB
+requests = lazy_import("requests")
+
 lists_bp = Blueprint("lists_bp", __name__, url_prefix="/api")
 
 
 # --------------------------- Create list -------------------------- #
 @lists_bp.route("/lists", methods=["POST"])
+@write_unit
 @jwt_required()
 def create_list():
     try:
@@ -60,7 +95,9 @@ def create_list():
             share_code=share_code,
         )
         db.session.add(new_list)
+        adjust_user_list_counts([current_user_id], 1)
         db.session.commit()
+        invalidate_list_membership(current_user_id)
         return jsonify({"message": "List created", "list_id": new_list.id}), 201
 
     except Exception as e:
@@ -85,6 +122,7 @@ def share_list(list_id):
 # -------------------------- Get all lists ------------------------- #
 @lists_bp.route("/lists", methods=["GET"])
 @jwt_required()
+@read_only
 def get_lists():
     try:
         current_user_id = get_jwt_identity()
@@ -112,19 +150,17 @@ def get_lists():
 
 def _serialize_list(lst: MediaList, current_uid: int, is_owner: bool):
     """Internal helper – build the JSON payload with user-specific ratings."""
-    user_count = get_list_user_count(lst.id)
+    user_count = lst.member_count
     
     media_items_payload = []
     for item in lst.media_items:
         # Get the user's personal rating for this media item
-        user_rating = UserMediaRating.query.filter_by(
-            user_id=current_uid, media_id=item.media_id
-        ).first()
+        user_rating = find_rating(current_uid, item.media_id)
         
         # Get average rating from all users with access to this list
         avg_rating = get_average_rating(item.media_id, lst.id)
         
-        media = Media.query.get(item.media_id)
+        media = db.session.get(Media, item.media_id)
         
         media_items_payload.append({
             "id": item.id,
@@ -158,6 +194,7 @@ def _serialize_list(lst: MediaList, current_uid: int, is_owner: bool):
 
 # ------------------------- Join a list ---------------------------- #
 @lists_bp.route("/lists/join", methods=["POST"])
+@write_unit
 @jwt_required()
 def join_list():
     try:
@@ -174,26 +211,31 @@ def join_list():
             raise NotFound("Invalid share code")
         if lst.owner_id == current_user_id:
             raise BadRequest("You cannot join your own list")
-        if SharedList.query.filter_by(list_id=lst.id, user_id=current_user_id).first():
+        if is_list_shared_with(current_user_id, lst.id):
             raise BadRequest("You already have access to this list")
-        if get_list_user_count(lst.id) >= MAX_USERS_PER_LIST:
+        if lst.member_count >= MAX_USERS_PER_LIST:
             raise BadRequest(f"This list has reached its maximum capacity of {MAX_USERS_PER_LIST} users")
 
         # Create the SharedList entry - add the user to the list
         db.session.add(SharedList(list_id=lst.id, user_id=current_user_id))
+        adjust_list_counters(lst.id, members=1)
+        record_member_change([lst.id], current_user_id)
+        adjust_user_list_counts([current_user_id], 1)
+        seed_timeline(current_user_id, lst.id)
         
         # Create UserMediaRating records for all media in the list
-        media_in_list = MediaInList.query.filter_by(list_id=lst.id).all()
-        for item in media_in_list:
-            # Get or create a user rating record for each media item in the list
-            get_or_create_user_rating(current_user_id, item.media_id)
+        create_missing_ratings(
+            [current_user_id],
+            db.select(MediaInList.media_id).where(MediaInList.list_id == lst.id),
+        )
         
         db.session.commit()
+        invalidate_list_membership(current_user_id)
 
         return jsonify({
             "message": "Successfully joined list",
             "list_id": lst.id,
-            "user_count": get_list_user_count(lst.id),
+            "user_count": lst.member_count,
             "max_users": MAX_USERS_PER_LIST,
         }), 200
 
@@ -231,8 +273,21 @@ def get_list_users(list_id):
         return jsonify({"error": str(e)}), 500
 
 
+def _delete_member_activity(list_id, user_id):
+    """Delete a departing member's events in a list and those on media they added."""
+    added_entries = db.select(MediaInList.id).where(
+        MediaInList.list_id == list_id, MediaInList.added_by_id == user_id
+    )
+    delete_activity(
+        ActivityEvent.list_id == list_id,
+        or_(ActivityEvent.user_id == user_id, ActivityEvent.media_in_list_id.in_(added_entries)),
+    )
+    drop_list_from_timeline(user_id, list_id)
+
+
 # ---------------------- Remove user from list --------------------- #
 @lists_bp.route("/lists/<int:list_id>/users/<int:user_id>", methods=["DELETE"])
+@write_unit
 @jwt_required()
 def remove_user_from_list(list_id, user_id):
     try:
@@ -245,25 +300,27 @@ def remove_user_from_list(list_id, user_id):
         media_in_list = MediaInList.query.filter_by(list_id=list_id).all()
         media_ids = [item.media_id for item in media_in_list]
         
-        # Delete media added by this user from the list
-        MediaInList.query.filter_by(list_id=list_id, added_by_id=user_id).delete()
+        # Drop the user's activity in this list, then the media they added
+        record_member_change([list_id], user_id)
+        _delete_member_activity(list_id, user_id)
+        removed_items = MediaInList.query.filter_by(list_id=list_id, added_by_id=user_id).delete()
         
         shared_access = SharedList.query.filter_by(list_id=list_id, user_id=user_id).first_or_404()
         db.session.delete(shared_access)
+        adjust_list_counters(list_id, members=-1, items=-removed_items)
+        adjust_user_list_counts([user_id], -1)
         db.session.commit()
+        invalidate_list_membership(user_id)
         
         # Now clean up orphaned ratings for the removed user
-        cleaned_ratings = []
-        for media_id in media_ids:
-            if clean_orphaned_ratings(user_id, media_id):
-                cleaned_ratings.append(media_id)
+        cleaned_ratings = clean_orphaned_ratings_bulk([user_id], media_ids)
         
         if cleaned_ratings:
             db.session.commit()
 
         return jsonify({
             "message": "User removed successfully. All media items added by this user have been removed from the list.",
-            "ratings_cleaned": len(cleaned_ratings)
+            "ratings_cleaned": cleaned_ratings
         }), 200
     except Exception as e:
         db.session.rollback()
@@ -272,6 +329,7 @@ def remove_user_from_list(list_id, user_id):
 
 # --------------------------- Leave list --------------------------- #
 @lists_bp.route("/lists/<int:list_id>/leave", methods=["POST"])
+@write_unit
 @jwt_required()
 def leave_list(list_id):
     try:
@@ -284,28 +342,30 @@ def leave_list(list_id):
         media_in_list = MediaInList.query.filter_by(list_id=list_id).all()
         media_ids = [item.media_id for item in media_in_list]
         
-        # Remove media items added by the user
-        MediaInList.query.filter_by(list_id=list_id, added_by_id=current_user_id).delete()
+        # Remove the user's activity and the media items they added
+        record_member_change([list_id], current_user_id)
+        _delete_member_activity(list_id, current_user_id)
+        removed_items = MediaInList.query.filter_by(list_id=list_id, added_by_id=current_user_id).delete()
         
         # Remove the user from the shared list
         shared_access = SharedList.query.filter_by(list_id=list_id, user_id=current_user_id).first_or_404()
         db.session.delete(shared_access)
+        adjust_list_counters(list_id, members=-1, items=-removed_items)
+        adjust_user_list_counts([current_user_id], -1)
         
         # Commit these changes first
         db.session.commit()
+        invalidate_list_membership(current_user_id)
         
         # Now clean up orphaned ratings
-        cleaned_ratings = []
-        for media_id in media_ids:
-            if clean_orphaned_ratings(current_user_id, media_id):
-                cleaned_ratings.append(media_id)
+        cleaned_ratings = clean_orphaned_ratings_bulk([current_user_id], media_ids)
         
         if cleaned_ratings:
             db.session.commit()
 
         return jsonify({
             "message": "Successfully left the list. All media items you added have been removed.",
-            "ratings_cleaned": len(cleaned_ratings)
+            "ratings_cleaned": cleaned_ratings
         }), 200
     except Exception as e:
         db.session.rollback()
@@ -320,19 +380,25 @@ def get_list(list_id):
         current_user_id = get_jwt_identity()
         lst = MediaList.query.get_or_404(list_id)
 
-        is_shared = SharedList.query.filter_by(list_id=list_id, user_id=current_user_id).first() is not None
-        if lst.owner_id != current_user_id and not is_shared:
+        is_shared = is_list_shared_with(current_user_id, list_id)
+        if not can_view(current_user_id, list_id):
             raise Forbidden("Not authorized to view this list")
 
+        etag = list_etag(lst, current_user_id)
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+
+        # Taken before reading so a change made meanwhile is in the next delta
+        cursor = changes_cursor(lst)
+
         media_items_payload = []
         for item in lst.media_items:
             # Get the associated media record
-            media = Media.query.get(item.media_id)
+            media = db.session.get(Media, item.media_id)
             
             # Get the user's personal rating
-            user_rating = UserMediaRating.query.filter_by(
-                user_id=current_user_id, media_id=item.media_id
-            ).first()
+            user_rating = find_rating(current_user_id, item.media_id)
             
             # Get average rating from all users with access to this list
             avg_rating = get_average_rating(item.media_id, list_id)
@@ -380,7 +446,7 @@ def get_list(list_id):
                     "added_by": {"id": item.added_by_id, "username": item.added_by.username},
                 })
 
-        return jsonify({
+        return with_etag(jsonify({
             "id": lst.id,
             "name": lst.name,
             "description": lst.description,
@@ -389,13 +455,126 @@ def get_list(list_id):
             "owner": {"id": lst.owner.id, "username": lst.owner.username},
             "share_code": lst.share_code,
             "media_items": media_items_payload,
+            "changes_cursor": cursor,
+        }), etag), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# ------------------ List changes since a cursor ------------------- #
+@lists_bp.route("/lists/<int:list_id>/changes", methods=["GET"])
+@jwt_required()
+@read_only
+def get_list_changes(list_id):
+    """Delta sync: entries and members that changed since ``since``, in their current state."""
+    try:
+        current_user_id = get_jwt_identity()
+        lst = MediaList.query.get_or_404(list_id)
+        if not can_view(current_user_id, list_id):
+            raise Forbidden("Not authorized to view this list")
+
+        since = decode_cursor(request.args.get("since"))
+        if since is None:
+            raise BadRequest("since is required (changes_cursor from GET /lists/<id>)")
+        if len(since) != 2 or not isinstance(since[0], datetime):
+            raise BadRequest("Invalid cursor")
+
+        changes = read_changes(lst, since)
+        if changes is None:
+            # Changes after the cursor were purged; GET the whole list again
+            return jsonify({"list_id": list_id, "reset": True}), 200
+
+        items, removed_items = [], []
+        if changes["item_ids"]:
+            entries = (
+                db.session.query(MediaInList, Media.tmdb_id, Media.media_type, User.username)
+                .join(Media, Media.id == MediaInList.media_id)
+                .join(User, User.id == MediaInList.added_by_id)
+                .filter(MediaInList.list_id == list_id, MediaInList.id.in_(changes["item_ids"]))
+                .all()
+            )
+            stats = _rating_stats(list_id, current_user_id, [entry.media_id for entry, *_ in entries])
+            for entry, tmdb_id, media_type, username in entries:
+                stat = stats.get(entry.media_id)
+                items.append({
+                    "id": entry.id,
+                    "media_id": entry.media_id,
+                    "tmdb_id": tmdb_id,
+                    "media_type": media_type,
+                    "added_date": entry.added_date.isoformat(),
+                    "last_updated": entry.last_updated.isoformat(),
+                    "added_by": {"id": entry.added_by_id, "username": username},
+                    "user_rating": {
+                        "watch_status": stat.watch_status if stat and stat.watch_status else "not_watched",
+                        "rating": stat.rating if stat else None,
+                    },
+                    "avg_rating": float(stat.average) if stat and stat.average else None,
+                    "rating_count": stat.rating_count if stat else 0,
+                })
+            found = {item["id"] for item in items}
+            removed_items = [entry_id for entry_id in changes["item_ids"] if entry_id not in found]
+
+        members = removed_members = None
+        if changes["member_ids"]:
+            owner = db.session.query(User.id, User.username).filter(User.id == lst.owner_id)
+            shared = (
+                db.session.query(User.id, User.username)
+                .join(SharedList, SharedList.user_id == User.id)
+                .filter(SharedList.list_id == list_id)
+            )
+            members = [
+                {"id": uid, "username": username, "is_owner": uid == lst.owner_id}
+                for uid, username in owner.union_all(shared).all()
+            ]
+            current_ids = {member["id"] for member in members}
+            removed_members = [uid for uid in changes["member_ids"] if uid not in current_ids]
+
+        return jsonify({
+            "list_id": list_id,
+            "reset": False,
+            "name": lst.name,
+            "description": lst.description,
+            "user_count": lst.member_count,
+            "items": items,
+            "removed_items": removed_items,
+            "members": members,
+            "removed_members": removed_members,
+            "cursor": changes["cursor"],
         }), 200
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def _rating_stats(list_id, user_id, media_ids):
+    """
+    media_id -> row of the viewer's ``watch_status`` / ``rating`` and the
+    members' ``average`` / ``rating_count``, in one grouped query.
+    """
+    if not media_ids:
+        return {}
+    mine = UserMediaRating.user_id == user_id
+    rows = db.session.execute(
+        db.select(
+            UserMediaRating.media_id,
+            func.max(db.case((mine, UserMediaRating.watch_status))).label("watch_status"),
+            func.max(db.case((mine, UserMediaRating.rating))).label("rating"),
+            func.avg(UserMediaRating.rating).label("average"),
+            func.count(UserMediaRating.rating).label("rating_count"),
+        )
+        .where(
+            UserMediaRating.media_id.in_(media_ids),
+            UserMediaRating.user_id.in_(list_member_ids_query(list_id)),
+        )
+        .group_by(UserMediaRating.media_id)
+    ).all()
+    return {row.media_id: row for row in rows}
+
+
 # ------------------------ Update list meta ------------------------ #
 @lists_bp.route("/lists/<int:list_id>", methods=["PUT"])
+@write_unit
 @jwt_required()
 def update_list(list_id):
     try:
@@ -411,6 +590,7 @@ def update_list(list_id):
             lst.description = data["description"]
 
         lst.last_updated = datetime.utcnow()
+        bump_list_versions([lst.id])
         db.session.commit()
 
         return jsonify({
@@ -424,6 +604,7 @@ def update_list(list_id):
 
 # --------------------------- Delete list -------------------------- #
 @lists_bp.route("/lists/<int:list_id>", methods=["DELETE"])
+@write_unit
 @jwt_required()
 def delete_list(list_id):
     try:
@@ -438,21 +619,19 @@ def delete_list(list_id):
         all_user_ids = [owner_id] + shared_user_ids
         
         # Get all media in this list for later cleanup
-        media_in_list = MediaInList.query.filter_by(list_id=list_id).all()
-        media_ids = [item.media_id for item in media_in_list]
+        media_ids = [media_id for (media_id,) in
+                     db.session.query(MediaInList.media_id).filter_by(list_id=list_id)]
         
-        # Delete all related list entries
-        MediaInList.query.filter_by(list_id=list_id).delete()
-        SharedList.query.filter_by(list_id=list_id).delete()
+        # Entries, shares, activity and timeline copies go with the list
+        # via ON DELETE CASCADE
         db.session.delete(lst)
+        adjust_user_list_counts(all_user_ids, -1)
         db.session.commit()
+        invalidate_list_membership()
+        drop_rating_distribution(list_id)
         
         # Now clean up orphaned ratings for all users
-        cleaned_ratings = 0
-        for user_id in all_user_ids:
-            for media_id in media_ids:
-                if clean_orphaned_ratings(user_id, media_id):
-                    cleaned_ratings += 1
+        cleaned_ratings = clean_orphaned_ratings_bulk(all_user_ids, media_ids)
         
         if cleaned_ratings > 0:
             db.session.commit()
@@ -468,6 +647,7 @@ def delete_list(list_id):
 
 # ---------------------- Add media to list ------------------------- #
 @lists_bp.route("/lists/<int:list_id>/media", methods=["POST"])
+@write_unit
 @jwt_required()
 def add_media_to_list(list_id):
     try:
@@ -479,14 +659,14 @@ def add_media_to_list(list_id):
             raise BadRequest("Invalid media type")
 
         lst = MediaList.query.get_or_404(list_id)
-        if lst.owner_id != current_user_id and not SharedList.query.filter_by(list_id=list_id, user_id=current_user_id).first():
+        if not can_view(current_user_id, list_id):
             raise Forbidden("Not authorized to add to this list")
 
         # Get or create the media record
         media = get_or_create_media(data["tmdb_id"], data["media_type"])
         
         # Create the media-list association
-        list_entry = MediaInList.query.filter_by(list_id=list_id, media_id=media.id).first()
+        list_entry = find_list_entry(list_id, media.id)
         if not list_entry:
             list_entry = MediaInList(
                 list_id=list_id,
@@ -495,11 +675,10 @@ def add_media_to_list(list_id):
                 added_by_id=current_user_id,
             )
             db.session.add(list_entry)
-        
-        # Get existing user rating - important to do this first to preserve existing ratings
-        user_rating = UserMediaRating.query.filter_by(
-            user_id=current_user_id, media_id=media.id
-        ).first()
+            db.session.flush()  # list_entry.id for the activity log
+            adjust_list_counters(list_id, items=1)
+            record_change(list_id, ITEM, list_entry.id)
+            record_added(list_entry)
         
         # Only create a new rating or update the existing rating if explicitly provided in request
         if "watch_status" in data or "rating" in data:
@@ -510,25 +689,13 @@ def add_media_to_list(list_id):
                 watch_status=data.get("watch_status"),
                 rating=data.get("rating")
             )
-        elif not user_rating:
-            # No rating exists yet - create a new one with default values
+            record_status(list_entry, user_rating)
+        else:
+            # Create a blank rating if there is none; an existing one is kept as is
             user_rating = get_or_create_user_rating(current_user_id, media.id)
-        # Else: Rating exists but no new values provided - we preserve the existing rating
         
         # Create default rating records for all other users with access to this list
-        # First, get the list owner if not the current user
-        if lst.owner_id != current_user_id:
-            # Only create if doesn't exist
-            if not UserMediaRating.query.filter_by(user_id=lst.owner_id, media_id=media.id).first():
-                get_or_create_user_rating(lst.owner_id, media.id)
-            
-        # Then all shared list users
-        shared_users = SharedList.query.filter_by(list_id=list_id).all()
-        for shared_user in shared_users:
-            if shared_user.user_id != current_user_id:  # Skip the current user
-                # Only create if doesn't exist
-                if not UserMediaRating.query.filter_by(user_id=shared_user.user_id, media_id=media.id).first():
-                    get_or_create_user_rating(shared_user.user_id, media.id)
+        create_missing_ratings(list_member_ids_query(list_id), [media.id])
         
         lst.last_updated = datetime.utcnow()
         db.session.commit()
@@ -537,7 +704,7 @@ def add_media_to_list(list_id):
             "message": "Media added successfully",
             "id": list_entry.id,
             "media_id": media.id,
-            "added_by": {"id": current_user_id, "username": User.query.get(current_user_id).username},
+            "added_by": {"id": current_user_id, "username": get_username(current_user_id)},
             "user_rating": {
                 "watch_status": user_rating.watch_status if user_rating else "not_watched",
                 "rating": user_rating.rating if user_rating else None,
@@ -550,6 +717,7 @@ def add_media_to_list(list_id):
 
 # ---------------------- Update media status ----------------------- #
 @lists_bp.route("/lists/<int:list_id>/media/<int:media_id>", methods=["PUT"])
+@write_unit
 @jwt_required()
 def update_media_status(list_id, media_id):
     try:
@@ -560,17 +728,25 @@ def update_media_status(list_id, media_id):
         list_media = MediaInList.query.filter_by(id=media_id, list_id=list_id).first_or_404()
         lst = MediaList.query.get_or_404(list_id)
 
-        if lst.owner_id != current_user_id and not SharedList.query.filter_by(list_id=list_id, user_id=current_user_id).first():
+        if not can_view(current_user_id, list_id):
             raise Forbidden("Not authorized to update media in this list")
 
+        # Queue the change when coalescing is on; it is committed with any
+        # other changes to this title that arrive within the window
+        if ("watch_status" in data or "rating" in data) and rating_coalescer.enabled:
+            rating_coalescer.submit(current_user_id, list_media.media_id, list_id, list_media.id,
+                                    watch_status=data.get("watch_status"), rating=data.get("rating"))
+            return jsonify({"message": "Status updated successfully"}), 200
+
         # Update the user's personal rating for this media
         if "watch_status" in data or "rating" in data:
-            update_user_rating(
+            user_rating = update_user_rating(
                 current_user_id,
                 list_media.media_id,
                 watch_status=data.get("watch_status"),
                 rating=data.get("rating")
             )
+            record_status(list_media, user_rating)
             lst.last_updated = datetime.utcnow()
             list_media.last_updated = datetime.utcnow()
 
@@ -583,12 +759,14 @@ def update_media_status(list_id, media_id):
 
 # ----------------------- Delete media entry ----------------------- #
 @lists_bp.route("/lists/<int:list_id>/media/<int:media_id>", methods=["DELETE"])
+@write_unit
 @jwt_required()
 def delete_media(list_id, media_id):
     return _delete_media_internal(list_id, media_id=media_id)
 
 
 @lists_bp.route("/lists/<int:list_id>/media/tmdb/<int:tmdb_id>", methods=["DELETE"])
+@write_unit
 @jwt_required()
 def delete_media_by_tmdb(list_id, tmdb_id):
     return _delete_media_internal(list_id, tmdb_id=tmdb_id)
@@ -598,7 +776,7 @@ def _delete_media_internal(list_id, media_id=None, tmdb_id=None):
     try:
         current_user_id = get_jwt_identity()
         lst = MediaList.query.get_or_404(list_id)
-        if lst.owner_id != current_user_id and not SharedList.query.filter_by(list_id=list_id, user_id=current_user_id).first():
+        if not can_view(current_user_id, list_id):
             raise Forbidden("Not authorized to modify this list")
 
         # Store media ID for later cleanup
@@ -617,6 +795,8 @@ def _delete_media_internal(list_id, media_id=None, tmdb_id=None):
             media_list_entry = MediaInList.query.filter_by(list_id=list_id, media_id=media.id).first_or_404()
             db.session.delete(media_list_entry)
 
+        record_change(list_id, ITEM, media_list_entry.id)
+        adjust_list_counters(list_id, items=-1)
         lst.last_updated = datetime.utcnow()
         db.session.commit()
         
@@ -626,10 +806,7 @@ def _delete_media_internal(list_id, media_id=None, tmdb_id=None):
         all_user_ids = [owner_id] + shared_user_ids
         
         # Clean up orphaned ratings for all users
-        cleaned_count = 0
-        for user_id in all_user_ids:
-            if clean_orphaned_ratings(user_id, actual_media_id):
-                cleaned_count += 1
+        cleaned_count = clean_orphaned_ratings_bulk(all_user_ids, [actual_media_id])
         
         if cleaned_count > 0:
             db.session.commit()
@@ -652,8 +829,7 @@ def get_media_ratings(list_id, media_id):
         lst = MediaList.query.get_or_404(list_id)
         
         # Check user has access to the list
-        is_shared = SharedList.query.filter_by(list_id=list_id, user_id=current_user_id).first() is not None
-        if lst.owner_id != current_user_id and not is_shared:
+        if not can_view(current_user_id, list_id):
             raise Forbidden("Not authorized to view this list")
             
         # Find the media record from the MediaInList entry
@@ -664,7 +840,7 @@ def get_media_ratings(list_id, media_id):
         ratings = get_all_ratings_for_media_in_list(list_id, media_id)
         
         # Get the Media record for TMDB details
-        media = Media.query.get(media_id)
+        media = db.session.get(Media, media_id)
         
         return jsonify({
             "media_id": media_id,
@@ -679,40 +855,49 @@ def get_media_ratings(list_id, media_id):
 # ----------------- Get user's ratings across lists ---------------- #
 @lists_bp.route("/user/ratings", methods=["GET"])
 @jwt_required()
+@read_only
 def get_user_ratings():
     try:
         current_user_id = get_jwt_identity()
+        # Pagination is opt-in here: without ?limit= every rating is returned
+        limit = get_page_limit(default=None)
+        cursor = get_page_cursor()
         
-        # Get all user's ratings
-        ratings = UserMediaRating.query.filter_by(user_id=current_user_id).all()
+        # Get the user's ratings, newest first
+        query = UserMediaRating.query.filter_by(user_id=current_user_id)
+        if limit is None:
+            page = query.order_by(UserMediaRating.updated_at.desc(), UserMediaRating.id.desc()).all()
+            next_cursor = None
+        else:
+            page = []
+            next_cursor = None
+            for (rating,), key in iter_keyset(query, UserMediaRating.updated_at, UserMediaRating.id,
+                                             after=cursor, batch_size=limit + 1):
+                if len(page) == limit:
+                    next_cursor = encode_cursor(page[-1].updated_at, page[-1].id)
+                    break
+                page.append(rating)
+        
+        # Media records and list memberships for the whole page in two queries
+        media_ids = [rating.media_id for rating in page]
+        media_by_id = {m.id: m for m in Media.query.filter(Media.id.in_(media_ids))}
+        lists_by_media = {}
+        for media_id, list_id, list_name in (
+            db.session.query(MediaInList.media_id, MediaList.id, MediaList.name)
+            .join(MediaList, MediaList.id == MediaInList.list_id)
+            .filter(
+                MediaInList.media_id.in_(media_ids),
+                MediaList.id.in_(get_accessible_list_ids(current_user_id)),
+            )
+        ):
+            lists_by_media.setdefault(media_id, []).append({"id": list_id, "name": list_name})
         
         result = []
-        for rating in ratings:
-            media = Media.query.get(rating.media_id)
+        for rating in page:
+            media = media_by_id[rating.media_id]
             
             # Get lists containing this media that the user has access to
-            owned_lists = (
-                MediaList.query.join(MediaInList)
-                .filter(
-                    MediaList.owner_id == current_user_id,
-                    MediaInList.media_id == rating.media_id
-                )
-                .all()
-            )
-            
-            shared_lists = (
-                MediaList.query.join(MediaInList).join(SharedList)
-                .filter(
-                    SharedList.user_id == current_user_id,
-                    MediaInList.media_id == rating.media_id
-                )
-                .all()
-            )
-            
-            lists = [
-                {"id": lst.id, "name": lst.name}
-                for lst in owned_lists + shared_lists
-            ]
+            lists = lists_by_media.get(rating.media_id, [])
             
             try:
                 tmdb_resp = requests.get(
@@ -748,68 +933,157 @@ def get_user_ratings():
                     "in_lists": lists
                 })
         
-        return jsonify({"ratings": result}), 200
+        return jsonify({"ratings": result, "next_cursor": next_cursor}), 200
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 # ----------------- Get average ratings for list ----------------- #
+RANKING_SORTS = ("score", "average", "count")
+
+
 @lists_bp.route("/lists/<int:list_id>/average_ratings", methods=["GET"])
 @jwt_required()
+@read_only
 def get_list_average_ratings(list_id):
     try:
         current_user_id = get_jwt_identity()
         lst = MediaList.query.get_or_404(list_id)
         
         # Check user has access to the list
-        is_shared = SharedList.query.filter_by(list_id=list_id, user_id=current_user_id).first() is not None
-        if lst.owner_id != current_user_id and not is_shared:
+        if not can_view(current_user_id, list_id):
             raise Forbidden("Not authorized to view this list")
-            
-        # Get all media items in this list
-        media_items = MediaInList.query.filter_by(list_id=list_id).all()
-        
+
+        sort = request.args.get("sort", "score")
+        if sort not in RANKING_SORTS:
+            raise BadRequest(f"sort must be one of: {', '.join(RANKING_SORTS)}")
+        try:
+            min_count = int(request.args.get("min_count", 1))
+        except ValueError:
+            raise BadRequest("min_count must be an integer")
+        if min_count < 1:
+            raise BadRequest("min_count must be at least 1")
+        # Pagination is opt-in: without ?limit= every rated item is returned
+        limit = get_page_limit(default=None)
+        # Cursors are (sort value, media id, sort) - only valid for the sort they came from
+        cursor = get_page_cursor()
+        after = None
+        if cursor is not None:
+            if len(cursor) != 3 or not isinstance(cursor[0], (int, float)):
+                raise BadRequest("Invalid cursor")
+            if cursor[2] != sort:
+                raise BadRequest("cursor was issued for a different sort")
+            after = cursor[:2]
+
+        etag = list_etag(lst, current_user_id, sort, min_count, limit, cursor)
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+
+        # Scores, sorting and the page cut all happen in one SQL statement
+        rankings = list_rankings(list_id, current_app.config["RANKING_PRIOR_WEIGHT"], min_count)
+        sort_col = {"score": rankings.c.score, "average": rankings.c.average,
+                    "count": rankings.c.rating_count}[sort]
+        query = db.session.query(rankings)
+        if limit is None:
+            page = query.order_by(sort_col.desc(), rankings.c.media_id.desc()).all()
+            next_cursor = None
+        else:
+            page = []
+            next_cursor = None
+            for row, key in iter_keyset(query, sort_col, rankings.c.media_id,
+                                        after=after, batch_size=limit + 1):
+                if len(page) == limit:
+                    next_cursor = encode_cursor(*last_key, sort)
+                    break
+                page.append(row)
+                last_key = key
+
+        # Metadata only for the rows being returned
+        media_by_id = {m.id: m for m in Media.query.filter(Media.id.in_([row[0] for row in page]))}
         average_ratings = []
-        for list_item in media_items:
-            # Get the Media record
-            media = Media.query.get(list_item.media_id)
-            
-            # Get the average rating
-            avg_rating = get_average_rating(list_item.media_id, list_id)
-            
-            # Only include media with at least one rating
-            if avg_rating["count"] > 0:
-                try:
-                    # Get TMDB details
-                    tmdb_resp = requests.get(
-                        f"https://api.themoviedb.org/3/{media.media_type}/{media.tmdb_id}",
-                        params={"api_key": current_app.config["TMDB_API_KEY"], "language": "en-US"},
-                        timeout=5,
-                    )
-                    tmdb_data = tmdb_resp.json()
-                    
-                    average_ratings.append({
-                        "tmdb_id": media.tmdb_id,
-                        "media_type": media.media_type,
-                        "average_rating": avg_rating["average"],
-                        "rating_count": avg_rating["count"],
-                        "title": tmdb_data.get("title") or tmdb_data.get("name"),
-                        "poster_path": tmdb_data.get("poster_path"),
-                        "overview": tmdb_data.get("overview"),
-                        "release_date": tmdb_data.get("release_date") or tmdb_data.get("first_air_date"),
-                        "vote_average": tmdb_data.get("vote_average"),
-                    })
-                except Exception as e:
-                    current_app.logger.error(f"TMDB fetch error: {e}")
-                    # Include basic info even if TMDB fetch fails
-                    average_ratings.append({
-                        "tmdb_id": media.tmdb_id,
-                        "media_type": media.media_type,
-                        "average_rating": avg_rating["average"],
-                        "rating_count": avg_rating["count"],
-                    })
+        for media_id, average, rating_count, score in page:
+            media = media_by_id[media_id]
+            item = {
+                "tmdb_id": media.tmdb_id,
+                "media_type": media.media_type,
+                "average_rating": float(average),
+                "rating_count": rating_count,
+                "bayesian_score": round(float(score), 4),
+            }
+            try:
+                # Get TMDB details
+                tmdb_resp = requests.get(
+                    f"https://api.themoviedb.org/3/{media.media_type}/{media.tmdb_id}",
+                    params={"api_key": current_app.config["TMDB_API_KEY"], "language": "en-US"},
+                    timeout=5,
+                )
+                tmdb_data = tmdb_resp.json()
+                item.update({
+                    "title": tmdb_data.get("title") or tmdb_data.get("name"),
+                    "poster_path": tmdb_data.get("poster_path"),
+                    "overview": tmdb_data.get("overview"),
+                    "release_date": tmdb_data.get("release_date") or tmdb_data.get("first_air_date"),
+                    "vote_average": tmdb_data.get("vote_average"),
+                })
+            except Exception as e:
+                current_app.logger.error(f"TMDB fetch error: {e}")
+                # Include basic info even if TMDB fetch fails
+            average_ratings.append(item)
         
-        return jsonify({"average_ratings": average_ratings}), 200
+        return with_etag(jsonify({"average_ratings": average_ratings, "next_cursor": next_cursor}), etag), 200
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# --------------- Rating distribution for list --------------- #
+@lists_bp.route("/lists/<int:list_id>/rating_distribution", methods=["GET"])
+@jwt_required()
+@read_only
+def get_list_rating_distribution(list_id):
+    try:
+        current_user_id = get_jwt_identity()
+        lst = MediaList.query.get_or_404(list_id)
+
+        # Check user has access to the list
+        if not can_view(current_user_id, list_id):
+            raise Forbidden("Not authorized to view this list")
+
+        # Optionally narrow to one list entry (same id as /lists/<id>/media/<media_id>)
+        entry_id = None
+        if request.args.get("media_id"):
+            try:
+                entry_id = int(request.args["media_id"])
+            except ValueError:
+                raise BadRequest("media_id must be an integer")
+
+        etag = list_etag(lst, current_user_id, entry_id)
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+
+        distribution = get_rating_distribution(list_id, lst.version, lst.member_count)
+        items = distribution["items"]
+        if entry_id is not None:
+            items = [item for item in items if item["id"] == entry_id]
+            if not items:
+                raise NotFound("Media not found in this list")
+
+        return with_etag(jsonify({
+            "list_id": list_id,
+            "version": lst.version,
+            "member_count": lst.member_count,
+            "overall": distribution["overall"],
+            "items": items,
+        }), etag), 200
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
+    except NotFound as e:
+        return jsonify({"error": e.description}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -824,9 +1098,13 @@ def get_roulette_media(list_id):
         lst = MediaList.query.get_or_404(list_id)
         
         # Check user has access to the list
-        is_shared = SharedList.query.filter_by(list_id=list_id, user_id=current_user_id).first() is not None
-        if lst.owner_id != current_user_id and not is_shared:
+        if not can_view(current_user_id, list_id):
             raise Forbidden("Not authorized to view this list")
+
+        etag = list_etag(lst, current_user_id)
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
         
         # Get all users with access to the list
         list_owner = User.query.get(lst.owner_id)
@@ -864,7 +1142,7 @@ def get_roulette_media(list_id):
         for media_in_list_item in media_in_list:
             try:
                 # Get the Media record
-                media = Media.query.get(media_in_list_item.media_id)
+                media = db.session.get(Media, media_in_list_item.media_id)
                 
                 # Get TMDB details
                 tmdb_resp = requests.get(
@@ -913,13 +1191,13 @@ def get_roulette_media(list_id):
                 current_app.logger.error(f"Error fetching TMDB data: {str(fetch_error)}")
                 continue
         
-        return jsonify({
+        return with_etag(jsonify({
             'media_items': results,
             'users': [
                 {'id': user.id, 'username': user.username}
                 for user in all_users
             ]
-        }), 200
+        }), etag), 200
         
     except Exception as e:
         current_app.logger.error(f"Error fetching roulette media: {str(e)}", exc_info=True)
@@ -940,10 +1218,7 @@ def get_media_by_tmdb_id(list_id):
             
         # Verify user has access to this list
         lst = MediaList.query.get_or_404(list_id)
-        is_owner = lst.owner_id == current_user_id
-        is_shared = SharedList.query.filter_by(list_id=list_id, user_id=current_user_id).first() is not None
-        
-        if not (is_owner or is_shared):
+        if not can_view(current_user_id, list_id):
             raise Forbidden("You do not have access to this list")
         
         # Find the media in the list
@@ -1,15 +1,17 @@
 """
 TMDB proxy endpoints (search + single title details).
 """
-import requests
 from flask import Blueprint, request, jsonify, current_app
 from werkzeug.exceptions import BadRequest
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import or_
 from extensions import db, limiter
-from models import MediaList, SharedList, Media, MediaInList
-from utils.helpers import get_list_user_count  # not used here but kept for parity
-from utils.suggestions import get_suggestions  # Import the get_suggestions function
+from models import Media, MediaInList
+from utils.helpers import lazy_import, get_list_user_count  # not used here but kept for parity
+from utils.access import get_accessible_list_ids
+from utils.db_routing import read_only
+
+# Only needed once a request hits TMDB
+requests = lazy_import("requests")
 
 media_bp = Blueprint("media_bp", __name__, url_prefix="/api")
 
@@ -17,6 +19,7 @@ media_bp = Blueprint("media_bp", __name__, url_prefix="/api")
 # ---------------------------- Search ------------------------------ #
 @media_bp.route("/search")
 @jwt_required()
+@read_only
 def search_media():
     try:
         current_user_id = get_jwt_identity()
@@ -41,13 +44,7 @@ def search_media():
         data = resp.json()
 
         # Get all lists the user has access to
-        user_lists = MediaList.query.filter(
-            or_(MediaList.owner_id == current_user_id,
-                MediaList.id.in_(
-                    db.session.query(SharedList.list_id).filter(SharedList.user_id == current_user_id)
-                )
-            )
-        ).all()
+        list_ids = get_accessible_list_ids(current_user_id)
         
         # Find media items in those lists that match the search results
         media_in_lists = {}
@@ -74,7 +71,7 @@ def search_media():
                     MediaInList.media_id, MediaInList.list_id
                 ).filter(
                     MediaInList.media_id.in_(media_ids),
-                    MediaInList.list_id.in_([lst.id for lst in user_lists])
+                    MediaInList.list_id.in_(list_ids)
                 ).all()
                 
                 # Create mapping from media ID to list IDs
@@ -129,6 +126,7 @@ def get_media_details(media_type, media_id):
 # ------------------------ Media Suggestions -------------------- #
 @media_bp.route("/suggestions")
 @jwt_required()
+@read_only
 @limiter.limit("3 per day")
 def get_media_suggestions():
     try:
@@ -145,7 +143,10 @@ def get_media_suggestions():
         if query == "":
             query = "Give me a completely random selection of media"
         
-        # Call the get_suggestions function from suggestions.py
+        # Call the get_suggestions function from suggestions.py (imported on first use;
+        # it pulls in rapidfuzz and the Groq client setup)
+        from utils.suggestions import get_suggestions
+
         response_dict, status_code = get_suggestions(
             query=query,
             genre_hint=genre_hint,
@@ -156,12 +157,7 @@ def get_media_suggestions():
         
         # Get the user's lists to check if suggested media is already added
         if status_code == 200 and "results" in response_dict:
-            user_lists = MediaList.query.filter(
-                or_(MediaList.owner_id == current_user_id,
-                    MediaList.id.in_(
-                        db.session.query(SharedList.list_id).filter(SharedList.user_id == current_user_id)
-                    ))
-            ).all()
+            list_ids = get_accessible_list_ids(current_user_id)
             
             # Get all the unique media types and IDs from the suggestions
             tmdb_info = []
@@ -187,7 +183,6 @@ def get_media_suggestions():
             media_in_lists = {}
             if media_records:
                 media_ids = list(media_records.values())
-                list_ids = [lst.id for lst in user_lists]
                 
                 media_list_entries = db.session.query(
                     MediaInList.media_id, MediaInList.list_id
@@ -188,6 +188,10 @@ def api_documentation():
                     "method": "GET",
                     "description": "Get all media items from all lists a user has access to",
                     "authentication": "JWT bearer token required",
+                    "query_params": {
+                        "limit":  "integer · optional · 1-100 · omit for the full collection",
+                        "cursor": "string · optional · next_cursor from the previous page"
+                    },
                     "response": {
                         "media_items": [
                             {
@@ -207,7 +211,8 @@ def api_documentation():
                                 "first_air_date": "string",
                                 "vote_average": "number"
                             }
-                        ]
+                        ],
+                        "next_cursor": "string | null"
                     }
                 },
                 "/api/user/media/<int:media_id>": {
@@ -223,6 +228,10 @@ def api_documentation():
                     "method": "GET",
                     "description": "User's personal activity feed showing their own activity",
                     "authentication": "JWT bearer token required",
+                    "query_params": {
+                        "limit":  "integer · optional · 1-100 · default: 20",
+                        "cursor": "string · optional · next_cursor from the previous page"
+                    },
                     "response": {
                         "feed_items": [
                             {
@@ -239,13 +248,18 @@ def api_documentation():
                                 "list_id": "integer",
                                 "list_name": "string"
                             }
-                        ]
+                        ],
+                        "next_cursor": "string | null"
                     }
                 },
                 "/api/feed/collaborators": {
                     "method": "GET",
                     "description": "Activity feed showing what other users in shared lists have done",
                     "authentication": "JWT bearer token required",
+                    "query_params": {
+                        "limit":  "integer · optional · 1-100 · default: 20",
+                        "cursor": "string · optional · next_cursor from the previous page"
+                    },
                     "response": {
                         "feed_items": [
                             {
@@ -263,7 +277,8 @@ def api_documentation():
                                 "list_id": "integer",
                                 "list_name": "string"
                             }
-                        ]
+                        ],
+                        "next_cursor": "string | null"
                     }
                 }
             },
@@ -287,11 +302,46 @@ def api_documentation():
                     "methods": ["GET", "PUT", "DELETE"],
                     "description": "Single list detail, metadata update, or delete (owner only).",
                     "authentication": "JWT bearer token required",
+                    "conditional_get": "GET responses carry a weak ETag tied to the list version; send it back as If-None-Match to get 304 Not Modified",
+                    "delta_sync": "GET responses include changes_cursor; pass it to /api/lists/<list_id>/changes instead of reloading the list",
                     "PUT_body": {
                         "name":        "string · optional · 1-80 chars",
                         "description": "string · optional · up to 100 chars"
                     }
                 },
+                "/api/lists/<list_id>/changes": {
+                    "method": "GET",
+                    "description": "Items (with the caller's rating and the members' average) and members changed since a cursor, in their current state. TMDB details are not included; fetch them for titles the client hasn't seen.",
+                    "authentication": "JWT bearer token required",
+                    "query_params": {
+                        "since": "string · required · changes_cursor from GET /api/lists/<list_id> or cursor from the previous call"
+                    },
+                    "response": {
+                        "list_id": "integer",
+                        "reset": "boolean · true when changes after the cursor have been purged; reload the list and nothing else is returned",
+                        "name": "string",
+                        "description": "string | null",
+                        "user_count": "integer",
+                        "items": [
+                            {
+                                "id": "integer",
+                                "media_id": "integer",
+                                "tmdb_id": "integer",
+                                "media_type": "movie | tv",
+                                "added_date": "ISO-8601",
+                                "last_updated": "ISO-8601",
+                                "added_by": { "id": "integer", "username": "string" },
+                                "user_rating": { "watch_status": "string", "rating": "integer | null" },
+                                "avg_rating": "number | null",
+                                "rating_count": "integer"
+                            }
+                        ],
+                        "removed_items": "[integer] · list entry ids no longer in the list",
+                        "members": "[{id, username, is_owner}] | null · full member list, only when membership changed",
+                        "removed_members": "[integer] | null · user ids no longer members",
+                        "cursor": "string · pass as since next time"
+                    }
+                },
                 "/api/lists/<list_id>/share": {
                     "method": "POST",
                     "description": "Owner retrieves the list's 8-character share code.",
@@ -343,6 +393,7 @@ def api_documentation():
                     "methods": ["PUT", "DELETE"],
                     "description": "Update watch_status / rating, or delete by internal media_id.",
                     "authentication": "JWT bearer token required",
+                    "coalescing": "With RATING_COALESCE_MS set, PUTs for the same title within the window are committed together; the caller's next request always sees them",
                     "PUT_body": {
                         "watch_status": "string · optional",
                         "rating":       "integer · optional · 1-10"
@@ -364,6 +415,87 @@ def api_documentation():
                         ]
                     }
                 },
+                "/api/lists/<list_id>/average_ratings": {
+                    "method": "GET",
+                    "description": "Rated items ranked by a Bayesian-weighted score (averages blended with the list mean).",
+                    "authentication": "JWT bearer token required",
+                    "conditional_get": "GET responses carry a weak ETag tied to the list version and the query parameters; send it back as If-None-Match to get 304 Not Modified",
+                    "query_params": {
+                        "sort":      "string · optional · score | average | count · default: score",
+                        "min_count": "integer · optional · minimum number of ratings · default: 1",
+                        "limit":     "integer · optional · 1-100 · omit for every rated item",
+                        "cursor":    "string · optional · next_cursor from the previous page; 400 if it was issued for another sort"
+                    },
+                    "response": {
+                        "average_ratings": [
+                            {
+                                "tmdb_id": "integer",
+                                "media_type": "movie | tv",
+                                "average_rating": "number",
+                                "rating_count": "integer",
+                                "bayesian_score": "number",
+                                "title": "string",
+                                "poster_path": "string",
+                                "overview": "string",
+                                "release_date": "string",
+                                "vote_average": "number"
+                            }
+                        ],
+                        "next_cursor": "string | null"
+                    }
+                },
+                "/api/lists/<list_id>/rating_distribution": {
+                    "method": "GET",
+                    "description": "Histogram of 1-10 ratings and watch-status counts across members, per item and for the whole list. Cached until the list changes.",
+                    "authentication": "JWT bearer token required",
+                    "conditional_get": "GET responses carry a weak ETag tied to the list version and media_id; send it back as If-None-Match to get 304 Not Modified",
+                    "query_params": {
+                        "media_id": "integer · optional · restrict items to one list entry"
+                    },
+                    "response": {
+                        "list_id": "integer",
+                        "version": "integer",
+                        "member_count": "integer",
+                        "overall": {
+                            "histogram": "[integer × 10] · counts for ratings 1..10",
+                            "rating_count": "integer",
+                            "average": "number | null",
+                            "watch_status": { "not_watched": "integer", "in_progress": "integer", "completed": "integer" }
+                        },
+                        "items": [
+                            {
+                                "id": "integer",
+                                "media_id": "integer",
+                                "tmdb_id": "integer",
+                                "media_type": "movie | tv",
+                                "histogram": "[integer × 10]",
+                                "rating_count": "integer",
+                                "average": "number | null",
+                                "watch_status": { "not_watched": "integer", "in_progress": "integer", "completed": "integer" }
+                            }
+                        ]
+                    }
+                },
+                "/api/lists/<list_id>/roulette": {
+                    "method": "GET",
+                    "description": "Every item in the list with each member's watch status and rating, for the roulette filters.",
+                    "authentication": "JWT bearer token required",
+                    "conditional_get": "GET responses carry a weak ETag tied to the list version; send it back as If-None-Match to get 304 Not Modified",
+                    "response": {
+                        "media_items": [
+                            {
+                                "id": "integer",
+                                "media_id": "integer",
+                                "tmdb_id": "integer",
+                                "media_type": "movie | tv",
+                                "title": "string",
+                                "added_by": { "id": "integer", "username": "string" },
+                                "user_ratings": { "<user_id>": { "user_id": "integer", "username": "string", "watch_status": "string", "rating": "number | null" } }
+                            }
+                        ],
+                        "users": [ { "id": "integer", "username": "string" } ]
+                    }
+                },
                 "/api/lists/<list_id>/media/tmdb/<tmdb_id>": {
                     "method": "DELETE",
                     "description": "Delete by TMDB ID instead of internal media_id (convenience).",
@@ -405,6 +537,52 @@ def api_documentation():
                     },
                     "rate_limit": "3 per day"
                 }
+            },
+            "admin": {
+                "/api/admin/users": {
+                    "method": "GET",
+                    "description": "List all users (admin only)"
+                },
+                "/api/admin/users/<user_id>/privilege": {
+                    "method": "PUT",
+                    "description": "Grant or revoke privileged rate limits (admin only)",
+                    "body": {
+                        "is_privilege": "boolean"
+                    }
+                },
+                "/api/admin/backup": {
+                    "method": "POST",
+                    "description": "Run an online SQLite backup into BACKUP_DIR and integrity-check it (admin only)",
+                    "response": {
+                        "message": "string",
+                        "backup": {
+                            "path": "string",
+                            "pages": "integer",
+                            "bytes": "integer",
+                            "seconds": "number",
+                            "integrity": "ok"
+                        }
+                    }
+                },
+                "/api/admin/slow-queries": {
+                    "methods": ["GET", "DELETE"],
+                    "description": "GET the slowest recorded SQL statements with their query plans; DELETE clears the log (admin only, requires SLOW_QUERY_MS)",
+                    "response": {
+                        "enabled": "boolean",
+                        "threshold_ms": "number | null",
+                        "queries": [{
+                            "shape": "string",
+                            "statement": "string",
+                            "parameters": "parameter types",
+                            "endpoint": "string | null",
+                            "query_plan": ["string"],
+                            "count": "integer",
+                            "max_ms": "number",
+                            "total_ms": "number",
+                            "recorded_at": "ISO datetime"
+                        }]
+                    }
+                }
             }
         },
 
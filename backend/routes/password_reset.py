@@ -12,6 +12,7 @@ from flask_jwt_extended import (
 )
 from extensions import db, limiter
 from models import User, VerificationCode
+from config import VERIFICATION_CODE_TTL
 from utils.email_utils import send_verification_email
 from werkzeug.security import generate_password_hash
 
@@ -88,7 +89,7 @@ def verify_reset_code():
         if not verification:
             raise BadRequest("Invalid verification code")
 
-        if datetime.utcnow() - verification.created_at > timedelta(minutes=15):
+        if datetime.utcnow() - verification.created_at > VERIFICATION_CODE_TTL:
             raise BadRequest("Verification code has expired")
 
         verification.used = True
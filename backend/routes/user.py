@@ -6,9 +6,38 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.exceptions import BadRequest, Unauthorized
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db, limiter
-from models import User, MediaInList, SharedList, VerificationCode, MediaList, Media, UserMediaRating
+from models import (
+    User,
+    MediaInList,
+    SharedList,
+    MediaList,
+    Media,
+    UserMediaRating,
+    ActivityEvent,
+)
 from sqlalchemy import or_, desc
-import requests
+from collections import Counter
+from utils.db_routing import read_only
+from utils.pagination import (
+    get_page_limit,
+    get_page_cursor,
+    encode_cursor,
+    iter_keyset,
+    union_per_value,
+)
+from utils.helpers import (
+    lazy_import,
+    adjust_list_counters,
+    adjust_user_list_counts,
+    refresh_item_counts,
+    bump_list_versions,
+    user_list_ids_query,
+)
+from utils.activity import collaborator_events_query, superseded
+from utils.changes import ITEM, record_change, record_member_change
+
+# Only needed once a request hits TMDB
+requests = lazy_import("requests")
 
 user_bp = Blueprint("user_bp", __name__, url_prefix="/api")
 
@@ -31,6 +60,10 @@ def update_profile():
             if User.query.filter(User.id != current_user_id,
                                  User.username == data["username"]).first():
                 raise BadRequest("Username already exists")
+            if data["username"] != user.username:
+                # Usernames appear in every list view the user is part of
+                bump_list_versions(user_list_ids_query(current_user_id))
+                record_member_change(user_list_ids_query(current_user_id), current_user_id)
             user.username = data["username"]
 
         if "email" in data:
@@ -70,16 +103,31 @@ def delete_profile():
         if not check_password_hash(user.password_hash, data["password"]):
             raise Unauthorized("Invalid password")
 
-        # Cascade deletes (same as monolith)
-        MediaInList.query.filter_by(added_by_id=current_user_id).delete()
-        SharedList.query.filter_by(user_id=current_user_id).delete()
-        VerificationCode.query.filter_by(user_id=current_user_id).delete()
-        # Also delete all user ratings
-        UserMediaRating.query.filter_by(user_id=current_user_id).delete()
-        from models import MediaList  # local import avoids circular issue
-        MediaList.query.filter_by(owner_id=current_user_id).delete()
+        # Lists whose denormalised counters change with this account
+        owned_list_ids = [lid for (lid,) in db.session.query(MediaList.id).filter_by(owner_id=current_user_id)]
+        joined_list_ids = [lid for (lid,) in db.session.query(SharedList.list_id).filter_by(user_id=current_user_id)]
+        contributed_list_ids = [
+            lid for (lid,) in db.session.query(MediaInList.list_id)
+            .filter_by(added_by_id=current_user_id).distinct()
+        ]
+        collaborator_ids = [
+            uid for (uid,) in db.session.query(SharedList.user_id)
+            .filter(SharedList.list_id.in_(owned_list_ids), SharedList.user_id != current_user_id)
+        ]
 
+        # Owned lists (with everything in them), shares, entries added to
+        # other lists, ratings, codes, activity and timeline rows all go
+        # with the user via ON DELETE CASCADE
+        record_member_change(joined_list_ids, current_user_id)
         db.session.delete(user)
+        db.session.flush()
+
+        for list_id in joined_list_ids:
+            adjust_list_counters(list_id, members=-1)
+        refresh_item_counts(set(contributed_list_ids) - set(owned_list_ids))
+        # Collaborators lose the owned lists that disappeared with the user
+        for uid, lost_lists in Counter(collaborator_ids).items():
+            adjust_user_list_counts([uid], -lost_lists)
         db.session.commit()
         return jsonify({"message": "Account deleted successfully"}), 200
 
@@ -91,6 +139,7 @@ def delete_profile():
 # ------------------------- User Media Collection ------------------------- #
 @user_bp.route("/user/media", methods=["GET", "OPTIONS"])
 @jwt_required()
+@read_only
 def get_user_media():
     # Handle OPTIONS request for CORS preflight
     if request.method == "OPTIONS":
@@ -98,6 +147,9 @@ def get_user_media():
 
     try:
         current_user_id = get_jwt_identity()
+        # Pagination is opt-in here: without ?limit= the whole collection is returned
+        limit = get_page_limit(default=None)
+        cursor = get_page_cursor()
         
         # Get all lists the user has access to (as owner or shared)
         user_lists = MediaList.query.filter(
@@ -109,7 +161,7 @@ def get_user_media():
         ).all()
         
         if not user_lists:
-            return jsonify({"media_items": []}), 200
+            return jsonify({"media_items": [], "next_cursor": None}), 200
         
         # Get all media items from these lists
         list_ids = [lst.id for lst in user_lists]
@@ -123,14 +175,29 @@ def get_user_media():
         ).outerjoin(
             UserMediaRating, 
             (Media.id == UserMediaRating.media_id) & (UserMediaRating.user_id == current_user_id)
-        ).filter(
-            MediaInList.list_id.in_(list_ids)
-        ).order_by(
-            desc(MediaInList.last_updated)
-        ).all()
+        )
+        # One ix_media_in_list_updated range per list, merged in order
+        query = union_per_value(query, MediaInList.list_id, list_ids)
+        
+        if limit is None:
+            rows = (
+                (row, None)
+                for row in query.order_by(desc(MediaInList.last_updated), desc(MediaInList.id)).all()
+            )
+        else:
+            rows = iter_keyset(query, MediaInList.last_updated, MediaInList.id,
+                               after=cursor, batch_size=limit + 1)
         
         media_items = []
-        for media, media_in_list, user_rating in query:
+        next_cursor = None
+        last_key = None
+        for (media, media_in_list, user_rating), key in rows:
+            # A further row exists, so the page is full and there is more to fetch
+            if limit is not None and len(media_items) == limit:
+                next_cursor = encode_cursor(*last_key)
+                break
+            last_key = key
+            
             # Get media details from TMDB
             try:
                 tmdb_api_key = current_app.config["TMDB_API_KEY"]
@@ -167,7 +234,7 @@ def get_user_media():
                     "rating": user_rating.rating if user_rating else None,
                     "last_updated": (user_rating.updated_at if user_rating else media_in_list.last_updated).isoformat(),
                     "list_id": media_in_list.list_id,
-                    "list_name": list_id_to_name.get(media_in_list.list_id, "Unknown List"),
+                    "list_name": list_name,
                     # Include release date fields from TMDB
                     "release_date": tmdb_data.get("release_date"),
                     "first_air_date": tmdb_data.get("first_air_date"),
@@ -180,8 +247,10 @@ def get_user_media():
                 current_app.logger.error(f"Error fetching TMDB data: {str(fetch_error)}")
                 continue
         
-        return jsonify({"media_items": media_items}), 200
+        return jsonify({"media_items": media_items, "next_cursor": next_cursor}), 200
     
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error fetching user media: {str(e)}", exc_info=True)
         return jsonify({"error": str(e)}), 500
@@ -218,6 +287,8 @@ def update_user_media(media_id):
         # DELETE request - remove media from list
         if request.method == "DELETE":
             db.session.delete(media_in_list)
+            adjust_list_counters(media_in_list.list_id, items=-1)
+            record_change(media_in_list.list_id, ITEM, media_in_list.id)
             db.session.commit()
             return jsonify({"message": "Media removed from list"}), 200
         
@@ -255,9 +326,81 @@ def update_user_media(media_id):
 
 
 # ------------------------- User Activity Feeds ------------------------- #
+# Both feeds read the append-only ActivityEvent log (see utils.activity), newest
+# first, joined to MediaInList so titles removed from a list drop out.
+def _accessible_lists(user_id):
+    return MediaList.query.filter(
+        or_(MediaList.owner_id == user_id,
+            MediaList.id.in_(
+                db.session.query(SharedList.list_id).filter(SharedList.user_id == user_id)
+            )
+        )
+    ).all()
+
+
+def _fetch_tmdb_details(media):
+    """TMDB details for a feed entry, or None if the lookup fails."""
+    try:
+        resp = requests.get(
+            f"https://api.themoviedb.org/3/{media.media_type}/{media.tmdb_id}",
+            params={
+                "api_key": current_app.config["TMDB_API_KEY"],
+                "language": "en-US",
+            },
+            timeout=5,
+        )
+        if resp.status_code != 200:
+            current_app.logger.warning(f"Failed to fetch details for {media.media_type}/{media.tmdb_id}: {resp.status_code}")
+            return None
+        return resp.json()
+    except Exception as fetch_error:
+        current_app.logger.error(f"Error fetching TMDB data for feed: {str(fetch_error)}")
+        return None
+
+
+def _status_action(event, default):
+    """Human readable action for a feed event."""
+    action = default
+    if event.event_type == "status":
+        if event.watch_status == "completed":
+            action = "completed watching"
+        elif event.watch_status == "in_progress":
+            action = "started watching"
+        # Include rating info if available
+        if event.rating is not None:
+            action += f" and rated {event.rating}/10"
+    return action
+
+
+def _feed_item(event, media_in_list, media, tmdb_data, list_name, action):
+    # Determine the title field based on media type
+    title = tmdb_data.get("title" if media.media_type == "movie" else "name", "Unknown Title")
+    return {
+        "id": media_in_list.id,
+        "user_id": event.user_id,
+        "media_id": media.id,
+        "media_title": title,
+        "media_type": media.media_type,
+        "poster_path": tmdb_data.get("poster_path"),
+        "overview": tmdb_data.get("overview"),
+        "vote_average": tmdb_data.get("vote_average"),
+        "release_date": tmdb_data.get("release_date"),
+        "first_air_date": tmdb_data.get("first_air_date"),
+        "list_id": media_in_list.list_id,
+        "list_name": list_name,
+        "action": action,
+        "watch_status": event.watch_status,
+        "rating": event.rating,
+        "timestamp": event.created_at.isoformat(),
+        "tmdb_id": media.tmdb_id,
+        "added_by_id": media_in_list.added_by_id
+    }
+
+
 # GET /feed/self → "Things I've done"
 @user_bp.route("/feed/self", methods=["GET", "OPTIONS"])
 @jwt_required()
+@read_only
 def get_user_self_feed():
     # Handle OPTIONS request for CORS preflight
     if request.method == "OPTIONS":
@@ -265,124 +408,54 @@ def get_user_self_feed():
         
     try:
         current_user_id = get_jwt_identity()
+        limit = get_page_limit()
+        cursor = get_page_cursor()
         
         # Get all lists the user has access to
-        user_lists = MediaList.query.filter(
-            or_(MediaList.owner_id == current_user_id,
-                MediaList.id.in_(
-                    db.session.query(SharedList.list_id).filter(SharedList.user_id == current_user_id)
-                )
-            )
-        ).all()
-        
+        user_lists = _accessible_lists(current_user_id)
         if not user_lists:
-            return jsonify({"feed_items": []}), 200
-        
-        # Get list IDs
-        list_ids = [lst.id for lst in user_lists]
+            return jsonify({"feed_items": [], "next_cursor": None}), 200
         
         # Create a mapping of list IDs to names for later use
         list_id_to_name = {lst.id: lst.name for lst in user_lists}
         
-        # Get media items for the self feed
-        media_query = (
-            db.session.query(MediaInList, Media, UserMediaRating)
-            .join(Media, Media.id == MediaInList.media_id)
-            .outerjoin(
-                UserMediaRating,
-                (UserMediaRating.media_id == Media.id) & (UserMediaRating.user_id == current_user_id)
-            )
+        # My latest event per title in lists I can still see
+        list_ids = list(list_id_to_name)
+        events_query = (
+            db.session.query(ActivityEvent, MediaInList, Media)
+            .join(MediaInList, MediaInList.id == ActivityEvent.media_in_list_id)
+            .join(Media, Media.id == ActivityEvent.media_id)
             .filter(
-                MediaInList.list_id.in_(list_ids),
-                or_(
-                    # Added → include only if added_by_id == current_user.id
-                    (MediaInList.added_by_id == current_user_id),
-                    # In-progress/Completed → include if list_member_id (user_id in UserMediaRating) == current_user.id
-                    (UserMediaRating.user_id == current_user_id) & 
-                    (UserMediaRating.watch_status.in_(["in_progress", "completed"]))
-                )
+                ActivityEvent.list_id.in_(list_ids),
+                ActivityEvent.user_id == current_user_id,
+                ~superseded(list_ids, "media_id", "user_id"),
             )
-            .order_by(desc(db.func.coalesce(UserMediaRating.updated_at, MediaInList.last_updated)))
-        ).all()
-        
-        # De-duplication by media_id (single response)
-        # Using a dictionary to keep only the most recent update for each media item
-        deduplicated_items = {}
+        )
+        rows = iter_keyset(events_query, ActivityEvent.created_at, ActivityEvent.id,
+                           after=cursor, batch_size=limit + 1)
         
         feed_items = []
-        for media_in_list, media, user_rating in media_query:
-            # Skip if we've already processed a more recent update for this media
-            if media.id in deduplicated_items:
-                continue
-                
-            # Mark this media as processed
-            deduplicated_items[media.id] = True
+        next_cursor = None
+        last_key = None
+        for (event, media_in_list, media), key in rows:
+            # A further row exists, so the page is full and there is more to fetch
+            if len(feed_items) == limit:
+                next_cursor = encode_cursor(*last_key)
+                break
+            last_key = key
             
-            # Fetch media details from TMDB
-            try:
-                tmdb_api_key = current_app.config["TMDB_API_KEY"]
-                
-                resp = requests.get(
-                    f"https://api.themoviedb.org/3/{media.media_type}/{media.tmdb_id}",
-                    params={
-                        "api_key": tmdb_api_key,
-                        "language": "en-US",
-                    },
-                    timeout=5,
-                )
-                
-                if resp.status_code != 200:
-                    current_app.logger.warning(f"Failed to fetch details for {media.media_type}/{media.tmdb_id}: {resp.status_code}")
-                    continue
-                
-                tmdb_data = resp.json()
-                
-                # Determine the title field based on media type
-                title = tmdb_data.get("title" if media.media_type == "movie" else "name", "Unknown Title")
-                
-                # Determine action based on watch status from UserMediaRating
-                action = "added to your list"
-                status = user_rating.watch_status if user_rating else "not_watched"
-                
-                if user_rating:
-                    if user_rating.watch_status == "completed":
-                        action = "completed watching"
-                    elif user_rating.watch_status == "in_progress":
-                        action = "started watching"
-                    
-                    # Include rating info if available
-                    if user_rating.rating:
-                        action += f" and rated {user_rating.rating}/10"
-                
-                # Create feed item
-                item = {
-                    "id": media_in_list.id,
-                    "user_id": current_user_id,
-                    "media_id": media.id,
-                    "media_title": title,
-                    "media_type": media.media_type,
-                    "poster_path": tmdb_data.get("poster_path"),
-                    "overview": tmdb_data.get("overview"),
-                    "vote_average": tmdb_data.get("vote_average"),
-                    "release_date": tmdb_data.get("release_date"),
-                    "first_air_date": tmdb_data.get("first_air_date"),
-                    "list_id": media_in_list.list_id,
-                    "list_name": list_id_to_name.get(media_in_list.list_id, "Unknown List"),
-                    "action": action,
-                    "watch_status": status,
-                    "rating": user_rating.rating if user_rating else None,
-                    "timestamp": (user_rating.updated_at if user_rating else media_in_list.last_updated).isoformat(),
-                    "tmdb_id": media.tmdb_id,
-                    "added_by_id": media_in_list.added_by_id
-                }
-                feed_items.append(item)
-                
-            except Exception as fetch_error:
-                current_app.logger.error(f"Error fetching TMDB data for feed: {str(fetch_error)}")
+            tmdb_data = _fetch_tmdb_details(media)
+            if tmdb_data is None:
                 continue
+            
+            action = _status_action(event, "added to your list")
+            list_name = list_id_to_name.get(media_in_list.list_id, "Unknown List")
+            feed_items.append(_feed_item(event, media_in_list, media, tmdb_data, list_name, action))
         
-        return jsonify({"feed_items": feed_items[:20]}), 200  # Limit to 20 items
+        return jsonify({"feed_items": feed_items, "next_cursor": next_cursor}), 200
         
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error fetching self feed: {str(e)}", exc_info=True)
         return jsonify({"error": str(e)}), 500
@@ -391,6 +464,7 @@ def get_user_self_feed():
 # GET /feed/collaborators → "Things my teammates did in our shared lists"
 @user_bp.route("/feed/collaborators", methods=["GET", "OPTIONS"])
 @jwt_required()
+@read_only
 def get_user_collaborators_feed():
     # Handle OPTIONS request for CORS preflight
     if request.method == "OPTIONS":
@@ -398,198 +472,37 @@ def get_user_collaborators_feed():
         
     try:
         current_user_id = get_jwt_identity()
+        limit = get_page_limit()
+        cursor = get_page_cursor()
         
-        # Get all lists the user has access to
-        user_lists = MediaList.query.filter(
-            or_(MediaList.owner_id == current_user_id,
-                MediaList.id.in_(
-                    db.session.query(SharedList.list_id).filter(SharedList.user_id == current_user_id)
-                )
-            )
-        ).all()
-        
-        if not user_lists:
-            return jsonify({"feed_items": []}), 200
-        
-        # Get list IDs
-        list_ids = [lst.id for lst in user_lists]
-        
-        # Create a mapping of list IDs to names for later use
-        list_id_to_name = {lst.id: lst.name for lst in user_lists}
-        
-        # De-duplication dictionaries
-        # 1. For "Added" events - track by (media_id, added_by_id)
-        added_items = {}
-        
-        # 2. For "In-progress"/"Completed" events - track by (media_id, user_id)
-        status_items = {}
+        # Everyone else's events in my lists (my timeline when fan-out is on)
+        events_query, sort_col, id_col = collaborator_events_query(current_user_id)
+        rows = iter_keyset(events_query, sort_col, id_col, after=cursor, batch_size=limit + 1)
         
-        # Process feed items from collaborators
         feed_items = []
-        
-        # Process "Added" actions - only include if added_by_id ≠ current_user.id AND added_by_id == event_author.id
-        added_media_query = (
-            db.session.query(MediaInList, Media, User)
-            .join(Media, Media.id == MediaInList.media_id)
-            .join(User, User.id == MediaInList.added_by_id)
-            .filter(
-                MediaInList.list_id.in_(list_ids),
-                MediaInList.added_by_id != current_user_id  # Added by someone else, not the current user
-            )
-            .order_by(desc(MediaInList.added_date))
-        ).all()
-        
-        # First pass - process "Added" events
-        for media_in_list, media, added_by_user in added_media_query:
-            # Skip if we've already processed this (media, user) combination for "Added" events
-            dedup_key = f"{media.id}:{added_by_user.id}:added"
-            if dedup_key in added_items:
-                continue
-                
-            # Mark as processed
-            added_items[dedup_key] = True
+        next_cursor = None
+        last_key = None
+        for (event, media_in_list, media, user, list_name), key in rows:
+            # A further row exists, so the page is full and there is more to fetch
+            if len(feed_items) == limit:
+                next_cursor = encode_cursor(*last_key)
+                break
+            last_key = key
             
-            try:
-                tmdb_api_key = current_app.config["TMDB_API_KEY"]
-                
-                resp = requests.get(
-                    f"https://api.themoviedb.org/3/{media.media_type}/{media.tmdb_id}",
-                    params={
-                        "api_key": tmdb_api_key,
-                        "language": "en-US",
-                    },
-                    timeout=5,
-                )
-                
-                if resp.status_code != 200:
-                    current_app.logger.warning(f"Failed to fetch details for {media.media_type}/{media.tmdb_id}: {resp.status_code}")
-                    continue
-                
-                tmdb_data = resp.json()
-                
-                # Determine the title field based on media type
-                title = tmdb_data.get("title" if media.media_type == "movie" else "name", "Unknown Title")
-                
-                # Create feed item for "Added" event
-                item = {
-                    "id": media_in_list.id,
-                    "user_id": added_by_user.id,
-                    "user_name": added_by_user.username,
-                    "media_id": media.id,
-                    "media_title": title,
-                    "media_type": media.media_type,
-                    "poster_path": tmdb_data.get("poster_path"),
-                    "overview": tmdb_data.get("overview"),
-                    "vote_average": tmdb_data.get("vote_average"),
-                    "release_date": tmdb_data.get("release_date"),
-                    "first_air_date": tmdb_data.get("first_air_date"),
-                    "list_id": media_in_list.list_id,
-                    "list_name": list_id_to_name.get(media_in_list.list_id, "Unknown List"),
-                    "action": "added to their watchlist",
-                    "watch_status": "not_watched",
-                    "rating": None,
-                    "timestamp": media_in_list.added_date.isoformat(),
-                    "tmdb_id": media.tmdb_id,
-                    "added_by_id": media_in_list.added_by_id
-                }
-                feed_items.append(item)
-                
-            except Exception as fetch_error:
-                current_app.logger.error(f"Error fetching TMDB data for feed: {str(fetch_error)}")
+            tmdb_data = _fetch_tmdb_details(media)
+            if tmdb_data is None:
                 continue
-        
-        # Second pass - process "In-progress" and "Completed" events
-        # In-progress & Completed / Rated → include when list_member_id ≠ current_user.id
-        status_query = (
-            db.session.query(MediaInList, Media, UserMediaRating, User)
-            .join(Media, Media.id == MediaInList.media_id)
-            .join(
-                UserMediaRating,
-                (UserMediaRating.media_id == Media.id) & 
-                (UserMediaRating.watch_status.in_(["in_progress", "completed"]))
-            )
-            .join(User, User.id == UserMediaRating.user_id)
-            .filter(
-                MediaInList.list_id.in_(list_ids),
-                UserMediaRating.user_id != current_user_id  # Not the current user's status
-            )
-            .order_by(desc(UserMediaRating.updated_at))
-        ).all()
-        
-        for media_in_list, media, user_rating, user in status_query:
-            # Skip if we've already processed this (media, user) combination for status events
-            dedup_key = f"{media.id}:{user.id}:{user_rating.watch_status}"
-            if dedup_key in status_items:
-                continue
-                
-            # Mark as processed
-            status_items[dedup_key] = True
             
-            try:
-                tmdb_api_key = current_app.config["TMDB_API_KEY"]
-                
-                resp = requests.get(
-                    f"https://api.themoviedb.org/3/{media.media_type}/{media.tmdb_id}",
-                    params={
-                        "api_key": tmdb_api_key,
-                        "language": "en-US",
-                    },
-                    timeout=5,
-                )
-                
-                if resp.status_code != 200:
-                    current_app.logger.warning(f"Failed to fetch details for {media.media_type}/{media.tmdb_id}: {resp.status_code}")
-                    continue
-                
-                tmdb_data = resp.json()
-                
-                # Determine the title field based on media type
-                title = tmdb_data.get("title" if media.media_type == "movie" else "name", "Unknown Title")
-                
-                # Determine action based on watch status
-                action = "added to their list"
-                if user_rating.watch_status == "completed":
-                    action = "completed watching"
-                elif user_rating.watch_status == "in_progress":
-                    action = "started watching"
-                
-                # Include rating info if available
-                if user_rating.rating is not None:
-                    action += f" and rated {user_rating.rating}/10"
-                
-                # Create feed item for status update
-                item = {
-                    "id": media_in_list.id,
-                    "user_id": user.id,
-                    "user_name": user.username,
-                    "media_id": media.id,
-                    "media_title": title,
-                    "media_type": media.media_type,
-                    "poster_path": tmdb_data.get("poster_path"),
-                    "overview": tmdb_data.get("overview"),
-                    "vote_average": tmdb_data.get("vote_average"),
-                    "release_date": tmdb_data.get("release_date"),
-                    "first_air_date": tmdb_data.get("first_air_date"),
-                    "list_id": media_in_list.list_id,
-                    "list_name": list_id_to_name.get(media_in_list.list_id, "Unknown List"),
-                    "action": action,
-                    "watch_status": user_rating.watch_status,
-                    "rating": user_rating.rating,
-                    "timestamp": user_rating.updated_at.isoformat(),
-                    "tmdb_id": media.tmdb_id,
-                    "added_by_id": media_in_list.added_by_id
-                }
-                feed_items.append(item)
-                
-            except Exception as fetch_error:
-                current_app.logger.error(f"Error fetching TMDB data for feed: {str(fetch_error)}")
-                continue
-        
-        # Sort by timestamp, most recent first
-        feed_items.sort(key=lambda x: x["timestamp"], reverse=True)
+            default_action = "added to their watchlist" if event.event_type == "added" else "added to their list"
+            item = _feed_item(event, media_in_list, media, tmdb_data, list_name,
+                              _status_action(event, default_action))
+            item["user_name"] = user.username
+            feed_items.append(item)
         
-        return jsonify({"feed_items": feed_items[:20]}), 200  # Limit to 20 items
+        return jsonify({"feed_items": feed_items, "next_cursor": next_cursor}), 200
         
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error fetching collaborators feed: {str(e)}", exc_info=True)
         return jsonify({"error": str(e)}), 500
@@ -598,6 +511,7 @@ def get_user_collaborators_feed():
 # Legacy endpoint - redirects to self feed for backward compatibility
 @user_bp.route("/user/feed", methods=["GET", "OPTIONS"])
 @jwt_required()
+@read_only
 def get_user_feed():
     # Handle OPTIONS request for CORS preflight
     if request.method == "OPTIONS":
@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_dir = tempfile.mkdtemp(prefix="whirlwatch-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.pop("DATABASE_READ_URL", None)
+for _key in ("JWT_SECRET_KEY", "TMDB_API_KEY", "MAIL_USERNAME", "MAIL_PASSWORD"):
+    os.environ.setdefault(_key, "test-secret-key-of-sufficient-length")
+
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+
+
+class _TmdbResponse:
+    status_code = 200
+
+    def __init__(self, url):
+        self.url = url
+
+    def json(self):
+        return {"title": f"Title {self.url.rsplit('/', 1)[-1]}"}
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture(autouse=True)
+def fresh_db(app, monkeypatch):
+    monkeypatch.setattr("requests.get", lambda url, **kwargs: _TmdbResponse(url))
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
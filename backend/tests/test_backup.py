@@ -0,0 +1,42 @@
+import os
+import sqlite3
+
+import pytest
+
+from utils import maintenance
+from utils.maintenance import backup_database
+
+
+def test_backup_writes_checked_copy(app, tmp_path):
+    destination = tmp_path / "copy.db"
+    with app.app_context():
+        summary = backup_database(str(destination))
+    assert summary["integrity"] == "ok"
+    assert destination.exists()
+    assert not os.path.exists(f"{destination}.partial")
+
+
+def test_failed_backup_cleans_up(app, tmp_path, monkeypatch):
+    destination = tmp_path / "copy.db"
+    opened = []
+
+    class FailingCheck(sqlite3.Connection):
+        def execute(self, sql, *args):
+            raise sqlite3.OperationalError("disk I/O error")
+
+    real_connect = sqlite3.connect
+
+    def connect(path):
+        conn = real_connect(path, factory=FailingCheck)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(maintenance.sqlite3, "connect", connect)
+    with app.app_context():
+        with pytest.raises(sqlite3.OperationalError):
+            backup_database(str(destination))
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].cursor()  # the copy's connection was closed
+    assert not destination.exists()
+    assert not os.path.exists(f"{destination}.partial")
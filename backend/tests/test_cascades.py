@@ -0,0 +1,75 @@
+from flask_jwt_extended import create_access_token
+from sqlalchemy import text
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models import User
+
+# Child table -> (column, parent table) pairs that must always resolve
+REFERENCES = {
+    "media_in_list": [("list_id", "media_list"), ("added_by_id", "user")],
+    "shared_list": [("list_id", "media_list"), ("user_id", "user")],
+    "user_media_rating": [("user_id", "user")],
+    "activity_event": [("list_id", "media_list"), ("user_id", "user")],
+    "timeline_entry": [("user_id", "user"), ("event_id", "activity_event")],
+    "list_change": [("list_id", "media_list")],
+}
+
+
+def _user(name):
+    user = User(username=name, email=f"{name}@example.com", password_hash=generate_password_hash("pw"))
+    db.session.add(user)
+    db.session.commit()
+    return {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}
+
+
+def _shared_list(client, owner, member, *tmdb_ids):
+    list_id = client.post("/api/lists", json={"name": "L"}, headers=owner).get_json()["list_id"]
+    code = client.post(f"/api/lists/{list_id}/share", headers=owner).get_json()["share_code"]
+    client.post("/api/lists/join", json={"share_code": code}, headers=member)
+    for headers, tmdb_id in zip((owner, member) * len(tmdb_ids), tmdb_ids):
+        client.post(f"/api/lists/{list_id}/media", json={"tmdb_id": tmdb_id, "media_type": "movie"}, headers=headers)
+    for headers in (owner, member):
+        for entry in client.get(f"/api/lists/{list_id}", headers=headers).get_json()["media_items"]:
+            client.put(f"/api/lists/{list_id}/media/{entry['id']}",
+                       json={"watch_status": "completed", "rating": 8}, headers=headers)
+    return list_id
+
+
+def _assert_no_orphans():
+    assert db.session.execute(text("PRAGMA foreign_key_check")).all() == []
+    for child, refs in REFERENCES.items():
+        for column, parent in refs:
+            orphans = db.session.execute(text(
+                f'SELECT COUNT(*) FROM "{child}" WHERE "{column}" NOT IN (SELECT id FROM "{parent}")'
+            )).scalar()
+            assert orphans == 0, f"{child}.{column} -> {parent}"
+
+
+def _populate(client):
+    alice, bob, carol = _user("alice"), _user("bob"), _user("carol")
+    lists = {
+        "alice_bob": _shared_list(client, alice, bob, 1, 2, 3),
+        "bob_carol": _shared_list(client, bob, carol, 2, 4),
+        "carol_alice": _shared_list(client, carol, alice, 3, 5),
+    }
+    return (alice, bob, carol), lists
+
+
+def test_delete_list_leaves_no_orphans(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "FEED_FANOUT", True)
+    (alice, _, _), lists = _populate(client)
+    assert db.session.execute(text("SELECT COUNT(*) FROM timeline_entry")).scalar() > 0
+
+    assert client.delete(f"/api/lists/{lists['alice_bob']}", headers=alice).status_code == 200
+    _assert_no_orphans()
+
+
+def test_delete_profile_leaves_no_orphans(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "FEED_FANOUT", True)
+    (_, bob, _), _ = _populate(client)
+
+    response = client.delete("/api/user/profile", json={"password": "pw"}, headers=bob)
+    assert response.status_code == 200
+    assert User.query.filter_by(username="bob").first() is None
+    _assert_no_orphans()
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from extensions import db
+from models import ActivityEvent, Media, MediaInList, MediaList, SharedList, TimelineEntry, User
+from utils.activity import fanout_enabled, rebuild_timelines
+
+
+def _seed():
+    """Two members of one list; several events per title, interleaved in time."""
+    me = User(username="me", email="me@example.com", password_hash="x")
+    mate = User(username="mate", email="mate@example.com", password_hash="x")
+    db.session.add_all([me, mate])
+    db.session.flush()
+    lst = MediaList(name="L", owner_id=me.id, share_code="ABCDEFGH", member_count=2)
+    db.session.add(lst)
+    db.session.flush()
+    db.session.add(SharedList(list_id=lst.id, user_id=mate.id))
+
+    start = datetime.utcnow() - timedelta(days=1)
+    tick = 0
+    for tmdb_id in range(1000, 1006):
+        media = Media(tmdb_id=tmdb_id, media_type="movie")
+        db.session.add(media)
+        db.session.flush()
+        entry = MediaInList(list_id=lst.id, media_id=media.id, added_by_id=me.id)
+        db.session.add(entry)
+        db.session.flush()
+        for user in (me, mate):
+            for event_type, status in (("added", "not_watched"), ("status", "in_progress"),
+                                       ("status", "completed"), ("status", "completed")):
+                db.session.add(ActivityEvent(
+                    list_id=lst.id, media_in_list_id=entry.id, media_id=media.id, user_id=user.id,
+                    event_type=event_type, watch_status=status,
+                    # Spread each title's events so stale ones land on later pages
+                    created_at=start + timedelta(minutes=tick * 7 % 48),
+                ))
+                tick += 1
+    db.session.flush()
+    if fanout_enabled():
+        rebuild_timelines()
+    db.session.commit()
+    return {"Authorization": f"Bearer {create_access_token(identity=me.id)}"}
+
+
+def _page_all(client, url, headers, limit):
+    items, cursor = [], None
+    while True:
+        query = f"{url}?limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(query, headers=headers).get_json()
+        items.extend(body["feed_items"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            return items
+
+
+def test_self_feed_pages_show_latest_event_per_title_once(client):
+    headers = _seed()
+    unpaged = _page_all(client, "/api/feed/self", headers, limit=100)
+    paged = _page_all(client, "/api/feed/self", headers, limit=2)
+
+    assert len(unpaged) == 6
+    assert [item["tmdb_id"] for item in paged] == [item["tmdb_id"] for item in unpaged]
+
+
+@pytest.mark.parametrize("fanout", [False, True])
+def test_collaborators_feed_pages_dedup_per_member_and_status(app, client, monkeypatch, fanout):
+    monkeypatch.setitem(app.config, "FEED_FANOUT", fanout)
+    headers = _seed()
+    unpaged = _page_all(client, "/api/feed/collaborators", headers, limit=100)
+    paged = _page_all(client, "/api/feed/collaborators", headers, limit=2)
+
+    keys = [(item["tmdb_id"], item["watch_status"]) for item in paged]
+    # added / in_progress / completed once per title
+    assert len(keys) == len(set(keys)) == 18
+    assert keys == [(item["tmdb_id"], item["watch_status"]) for item in unpaged]
+
+
+def test_fan_out_drops_superseded_timeline_entries(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "FEED_FANOUT", True)
+    owner, mate = (User(username=name, email=f"{name}@example.com", password_hash="x") for name in ("me", "mate"))
+    db.session.add_all([owner, mate])
+    db.session.commit()
+    me = {"Authorization": f"Bearer {create_access_token(identity=owner.id)}"}
+    them = {"Authorization": f"Bearer {create_access_token(identity=mate.id)}"}
+    list_id = client.post("/api/lists", json={"name": "L"}, headers=me).get_json()["list_id"]
+    code = client.post(f"/api/lists/{list_id}/share", headers=me).get_json()["share_code"]
+    client.post("/api/lists/join", json={"share_code": code}, headers=them)
+    entry_id = client.post(f"/api/lists/{list_id}/media", json={"tmdb_id": 1, "media_type": "movie"},
+                           headers=them).get_json()["id"]
+    for rating in (5, 6, 7):
+        client.put(f"/api/lists/{list_id}/media/{entry_id}",
+                   json={"watch_status": "completed", "rating": rating}, headers=them)
+
+    feed = client.get("/api/feed/collaborators", headers=me).get_json()["feed_items"]
+    assert [(item["watch_status"], item["rating"]) for item in feed] == [("completed", 7), ("not_watched", None)]
+    assert feed[0]["list_name"] == "L"
+    # Only the two entries the feed shows are left in the timeline
+    assert TimelineEntry.query.filter_by(user_id=owner.id).count() == 2
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+
+from extensions import db
+from models import ListChange, User
+from utils.maintenance import purge_list_changes
+
+
+def _owner_with_list(client):
+    user = User(username="owner", email="owner@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}
+    list_id = client.post("/api/lists", json={"name": "L"}, headers=headers).get_json()["list_id"]
+    for tmdb_id in (1, 2):
+        client.post(f"/api/lists/{list_id}/media", json={"tmdb_id": tmdb_id, "media_type": "movie"}, headers=headers)
+    return list_id, headers
+
+
+def _age_changes(days):
+    db.session.query(ListChange).update({ListChange.created_at: datetime.utcnow() - timedelta(days=days)})
+    db.session.commit()
+
+
+def _sync(client, list_id, headers, cursor):
+    return client.get(f"/api/lists/{list_id}/changes?since={cursor}", headers=headers).get_json()
+
+
+def test_idle_list_syncs_without_reset(client):
+    list_id, headers = _owner_with_list(client)
+    _age_changes(days=365)  # older than the retention window, but not purged
+
+    cursor = client.get(f"/api/lists/{list_id}", headers=headers).get_json()["changes_cursor"]
+    body = _sync(client, list_id, headers, cursor)
+    assert body["reset"] is False
+    assert body["items"] == []
+
+
+def test_only_cursors_behind_purged_changes_reset(client):
+    list_id, headers = _owner_with_list(client)
+    stale = client.get(f"/api/lists/{list_id}", headers=headers).get_json()["changes_cursor"]
+    client.post(f"/api/lists/{list_id}/media", json={"tmdb_id": 3, "media_type": "movie"}, headers=headers)
+    _age_changes(days=365)
+    assert purge_list_changes() > 0
+
+    assert _sync(client, list_id, headers, stale)["reset"] is True
+
+    # A fresh full load starts past the purged rows and keeps syncing
+    cursor = client.get(f"/api/lists/{list_id}", headers=headers).get_json()["changes_cursor"]
+    for _ in range(2):
+        body = _sync(client, list_id, headers, cursor)
+        assert body["reset"] is False
+        cursor = body["cursor"]
+
+
+def test_sync_after_purging_every_change(client):
+    list_id, headers = _owner_with_list(client)
+    _age_changes(days=365)
+    assert purge_list_changes() > 0
+    assert db.session.query(ListChange).count() == 0
+
+    cursor = client.get(f"/api/lists/{list_id}", headers=headers).get_json()["changes_cursor"]
+    client.post(f"/api/lists/{list_id}/media", json={"tmdb_id": 3, "media_type": "movie"}, headers=headers)
+    body = _sync(client, list_id, headers, cursor)
+    assert body["reset"] is False
+    assert len(body["items"]) == 1
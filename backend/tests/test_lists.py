@@ -0,0 +1,96 @@
+from flask_jwt_extended import create_access_token
+from sqlalchemy import text
+
+from extensions import db
+from models import User
+
+
+def _user(name):
+    user = User(username=name, email=f"{name}@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    return {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}
+
+
+def _new_list(client, headers, *tmdb_ids):
+    list_id = client.post("/api/lists", json={"name": "L"}, headers=headers).get_json()["list_id"]
+    for tmdb_id in tmdb_ids:
+        client.post(f"/api/lists/{list_id}/media", json={"tmdb_id": tmdb_id, "media_type": "movie"}, headers=headers)
+    return list_id
+
+
+def _rate_all(client, list_id, headers):
+    entries = client.get(f"/api/lists/{list_id}", headers=headers).get_json()["media_items"]
+    for entry in entries:
+        client.put(f"/api/lists/{list_id}/media/{entry['id']}", json={"rating": 7}, headers=headers)
+
+
+def test_deleted_list_id_is_not_reused(client):
+    alice, bob = _user("alice"), _user("bob")
+    old_id = _new_list(client, alice, 111)
+    _rate_all(client, old_id, alice)
+    old = client.get(f"/api/lists/{old_id}/rating_distribution", headers=alice).get_json()
+    assert [item["tmdb_id"] for item in old["items"]] == [111]
+    assert client.delete(f"/api/lists/{old_id}", headers=alice).status_code == 200
+
+    new_id = _new_list(client, bob, 222)
+    _rate_all(client, new_id, bob)
+    assert new_id != old_id
+    new = client.get(f"/api/lists/{new_id}/rating_distribution", headers=bob).get_json()
+    assert [item["tmdb_id"] for item in new["items"]] == [222]
+
+
+def test_etag_of_deleted_list_does_not_match_its_successor(client):
+    alice = _user("alice")
+    old_id = _new_list(client, alice)
+    etag = client.get(f"/api/lists/{old_id}", headers=alice).headers["ETag"]
+    client.delete(f"/api/lists/{old_id}", headers=alice)
+    # A database from before AUTOINCREMENT may still hand the id out again
+    db.session.execute(text("DELETE FROM sqlite_sequence WHERE name = 'media_list'"))
+    db.session.commit()
+
+    new_id = _new_list(client, alice)
+    assert new_id == old_id
+    response = client.get(f"/api/lists/{new_id}", headers={**alice, "If-None-Match": etag})
+    assert response.status_code == 200
+
+
+def test_adding_a_rated_title_to_another_list_keeps_the_rating(client):
+    alice = _user("alice")
+    first = _new_list(client, alice, 111)
+    entry = client.get(f"/api/lists/{first}", headers=alice).get_json()["media_items"][0]
+    client.put(f"/api/lists/{first}/media/{entry['id']}",
+               json={"watch_status": "completed", "rating": 9}, headers=alice)
+
+    second = client.post("/api/lists", json={"name": "M"}, headers=alice).get_json()["list_id"]
+    body = client.post(f"/api/lists/{second}/media", json={"tmdb_id": 111, "media_type": "movie"},
+                       headers=alice).get_json()
+    assert body["user_rating"] == {"watch_status": "completed", "rating": 9}
+
+
+def _rankings(client, list_id, headers, query="", etag=None):
+    if etag is not None:
+        headers = {**headers, "If-None-Match": etag}
+    return client.get(f"/api/lists/{list_id}/average_ratings{query}", headers=headers)
+
+
+def test_rankings_validate_parameters_before_conditional_get(client):
+    alice = _user("alice")
+    list_id = _new_list(client, alice, 1, 2, 3)
+    entries = client.get(f"/api/lists/{list_id}", headers=alice).get_json()["media_items"]
+    for entry, rating in zip(entries, (6, 8, 9)):
+        client.put(f"/api/lists/{list_id}/media/{entry['id']}",
+                   json={"watch_status": "completed", "rating": rating}, headers=alice)
+
+    etag = _rankings(client, list_id, alice).headers["ETag"]
+    assert _rankings(client, list_id, alice, etag=etag).status_code == 304
+    assert _rankings(client, list_id, alice, "?sort=bogus", etag=etag).status_code == 400
+    assert _rankings(client, list_id, alice, "?sort=count", etag=etag).status_code == 200
+
+    # Each page has its own tag, and a cursor only fits the sort it was issued for
+    first = _rankings(client, list_id, alice, "?limit=1")
+    cursor = first.get_json()["next_cursor"]
+    second = _rankings(client, list_id, alice, f"?limit=1&cursor={cursor}", etag=first.headers["ETag"])
+    assert second.status_code == 200
+    assert second.get_json()["average_ratings"] != first.get_json()["average_ratings"]
+    assert _rankings(client, list_id, alice, f"?limit=1&sort=count&cursor={cursor}").status_code == 400
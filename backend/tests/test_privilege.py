@@ -0,0 +1,31 @@
+from flask_jwt_extended import create_access_token, verify_jwt_in_request
+
+from extensions import _privilege_cache, db, is_privileged_request
+from models import User
+
+
+def _is_privileged(app, token):
+    with app.test_request_context(headers={"Authorization": f"Bearer {token}"}):
+        verify_jwt_in_request()
+        return is_privileged_request()
+
+
+def test_demotion_outlives_the_process_cache(app, client):
+    admin = User(username="admin", email="admin@example.com", password_hash="x", is_admin=True)
+    member = User(username="member", email="member@example.com", password_hash="x", is_privilege=True)
+    db.session.add_all([admin, member])
+    db.session.commit()
+    member_token = create_access_token(identity=member.id)
+    admin_token = create_access_token(identity=admin.id)
+    assert _is_privileged(app, member_token) is True
+
+    response = client.put(f"/api/admin/users/{member.id}/privilege", json={"is_privilege": False},
+                          headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+
+    # Another worker, or this one after a restart, has nothing cached
+    _privilege_cache.clear()
+    assert _is_privileged(app, member_token) is False
+    # Tokens issued after the change carry the new claim
+    db.session.expire_all()
+    assert _is_privileged(app, create_access_token(identity=member.id)) is False
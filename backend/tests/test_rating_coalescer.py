@@ -0,0 +1,88 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from extensions import db
+from models import User, UserMediaRating
+from utils import rating_coalescer as coalescer_module
+from utils.rating_coalescer import RatingCoalescer
+
+
+@pytest.fixture
+def entry(client):
+    user = User(username="owner", email="owner@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}
+    list_id = client.post("/api/lists", json={"name": "L"}, headers=headers).get_json()["list_id"]
+    body = client.post(f"/api/lists/{list_id}/media", json={"tmdb_id": 1, "media_type": "movie"},
+                       headers=headers).get_json()
+    return user.id, body["media_id"], list_id, body["id"]
+
+
+@pytest.fixture
+def coalescer(app):
+    coalescer = RatingCoalescer()
+    coalescer.window = 60  # keep the background flusher out of the way
+    coalescer.max_retries = 2
+    coalescer._app = app
+    return coalescer
+
+
+def _failing(monkeypatch, error, times):
+    real = coalescer_module.apply_rating_changes
+    calls = []
+
+    def apply(changes):
+        calls.append(len(changes))
+        if len(calls) <= times:
+            raise error
+        real(changes)
+
+    monkeypatch.setattr(coalescer_module, "apply_rating_changes", apply)
+    return calls
+
+
+def _rating(user_id, media_id):
+    db.session.expire_all()
+    return UserMediaRating.query.filter_by(user_id=user_id, media_id=media_id).one()
+
+
+def test_transient_failure_is_retried(coalescer, entry, monkeypatch):
+    user_id, media_id, list_id, entry_id = entry
+    calls = _failing(monkeypatch, OperationalError("UPDATE", {}, Exception("database is locked")), times=1)
+
+    coalescer.submit(user_id, media_id, list_id, entry_id, watch_status="completed", rating=7)
+    coalescer.flush_user(user_id)
+    assert coalescer.has_pending()
+    # A change made while the failed one waits is applied after it
+    coalescer.submit(user_id, media_id, list_id, entry_id, rating=9)
+    coalescer.flush_user(user_id)
+
+    assert calls == [1, 1]
+    assert not coalescer.has_pending()
+    rating = _rating(user_id, media_id)
+    assert (rating.watch_status, rating.rating) == ("completed", 9)
+
+
+def test_changes_are_dropped_after_the_last_retry(coalescer, entry, monkeypatch):
+    user_id, media_id, list_id, entry_id = entry
+    calls = _failing(monkeypatch, OperationalError("UPDATE", {}, Exception("database is locked")), times=10)
+
+    coalescer.submit(user_id, media_id, list_id, entry_id, watch_status="completed", rating=7)
+    coalescer.flush_all()
+
+    assert len(calls) == coalescer.max_retries + 1
+    assert not coalescer.has_pending()
+    assert _rating(user_id, media_id).rating is None
+
+
+def test_other_errors_are_not_retried(coalescer, entry, monkeypatch):
+    user_id, media_id, list_id, entry_id = entry
+    calls = _failing(monkeypatch, IntegrityError("UPDATE", {}, Exception("constraint failed")), times=1)
+
+    coalescer.submit(user_id, media_id, list_id, entry_id, watch_status="completed", rating=7)
+    coalescer.flush_user(user_id)
+
+    assert calls == [1]
+    assert not coalescer.has_pending()
@@ -0,0 +1,62 @@
+"""
+Request-scoped list access checks.
+
+The caller's full membership (owned + shared list IDs) is resolved with a
+single query the first time it is needed and memoised on ``flask.g``, so
+every later ``can_view`` check in the same request is answered from memory.
+"""
+from flask import g
+from sqlalchemy import literal, union_all
+
+from extensions import db
+from models import MediaList, SharedList
+
+
+def get_list_membership(user_id):
+    """
+    Return ``{"owned": set, "shared": set}`` of list IDs for a user.
+    Cached for the lifetime of the current request.
+    """
+    cache = g.setdefault("_list_membership", {})
+    if user_id in cache:
+        return cache[user_id]
+
+    owned_q = db.select(MediaList.id, literal(True)).where(MediaList.owner_id == user_id)
+    shared_q = db.select(SharedList.list_id, literal(False)).where(SharedList.user_id == user_id)
+    rows = db.session.execute(union_all(owned_q, shared_q)).all()
+
+    membership = {
+        "owned": {list_id for list_id, is_owner in rows if is_owner},
+        "shared": {list_id for list_id, is_owner in rows if not is_owner},
+    }
+    cache[user_id] = membership
+    return membership
+
+
+def invalidate_list_membership(user_id=None):
+    """Drop the cached membership (for one user, or everyone) after a change."""
+    cache = g.get("_list_membership")
+    if cache is None:
+        return
+    if user_id is None:
+        cache.clear()
+    else:
+        cache.pop(user_id, None)
+
+
+def get_accessible_list_ids(user_id):
+    """All list IDs the user owns or has been shared into."""
+    membership = get_list_membership(user_id)
+    return membership["owned"] | membership["shared"]
+
+
+def is_list_shared_with(user_id, list_id):
+    return list_id in get_list_membership(user_id)["shared"]
+
+
+def can_view(user_id, list_id):
+    """
+    Owner or shared member of the list. Lists are fully collaborative, so
+    this also gates adding, rating and removing media.
+    """
+    return list_id in get_accessible_list_ids(user_id)
@@ -0,0 +1,307 @@
+"""
+Activity event log used by the feeds.
+
+Events are written at the moment something happens (media added, watch
+status / rating changed) so the feeds become an indexed range read instead
+of being reconstructed from joins on every call.
+
+With ``FEED_FANOUT`` enabled each event is also copied into the timeline of
+every other member of its list (fan-out on write). Entries an event makes
+stale (see COLLABORATOR_FEED_KEY) are deleted as it is copied, so the
+collaborators feed is a plain ``(user_id, created_at)`` range read of one
+user's timeline instead of a scan of every list they belong to, at the
+cost of up to MAX_USERS_PER_LIST - 1 extra rows per event.
+"""
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import aliased
+
+from extensions import db
+from models import ActivityEvent, MediaInList, MediaList, SharedList, UserMediaRating, TimelineEntry, User, Media
+from utils.access import get_accessible_list_ids
+from utils.ratings import list_member_ids_query
+from utils.pagination import union_per_value
+
+# Only these statuses produce a feed entry
+FEED_STATUSES = ("in_progress", "completed")
+# The collaborators feed shows only the latest event per these columns:
+# "added" once per (title, member), status once per (title, member, status)
+COLLABORATOR_FEED_KEY = ("media_id", "user_id", "event_type", "watch_status")
+
+
+def fanout_enabled():
+    return current_app.config.get("FEED_FANOUT", False)
+
+
+def _append(event):
+    db.session.add(event)
+    if fanout_enabled():
+        fan_out(event)
+
+
+def record_added(list_entry):
+    """Log that ``list_entry.added_by_id`` added a title to a list."""
+    _append(ActivityEvent(
+        list_id=list_entry.list_id,
+        media_in_list_id=list_entry.id,
+        media_id=list_entry.media_id,
+        user_id=list_entry.added_by_id,
+        event_type="added",
+        watch_status="not_watched",
+        created_at=list_entry.added_date or datetime.utcnow(),
+    ))
+
+
+def record_status(list_entry, user_rating):
+    """Log a watch-status / rating change if it is one the feeds show."""
+    if user_rating.watch_status not in FEED_STATUSES:
+        return
+    _append(ActivityEvent(
+        list_id=list_entry.list_id,
+        media_in_list_id=list_entry.id,
+        media_id=list_entry.media_id,
+        user_id=user_rating.user_id,
+        event_type="status",
+        watch_status=user_rating.watch_status,
+        rating=user_rating.rating,
+        created_at=user_rating.updated_at or datetime.utcnow(),
+    ))
+
+
+def backfill_activity():
+    """
+    Populate the event log from existing list entries and ratings.
+    Only runs against an empty table; returns the number of events written.
+    """
+    if db.session.query(ActivityEvent.id).first() is not None:
+        return 0
+
+    columns = ["list_id", "media_in_list_id", "media_id", "user_id",
+               "event_type", "watch_status", "rating", "created_at"]
+
+    added = db.select(
+        MediaInList.list_id, MediaInList.id, MediaInList.media_id, MediaInList.added_by_id,
+        db.literal("added"), db.literal("not_watched"), db.null(), MediaInList.added_date,
+    )
+
+    # A member's current status, attributed to every list of theirs holding the title
+    is_member = db.or_(
+        MediaList.owner_id == UserMediaRating.user_id,
+        db.select(SharedList.id).where(
+            SharedList.list_id == MediaInList.list_id,
+            SharedList.user_id == UserMediaRating.user_id,
+        ).exists(),
+    )
+    statuses = (
+        db.select(
+            MediaInList.list_id, MediaInList.id, MediaInList.media_id, UserMediaRating.user_id,
+            db.literal("status"), UserMediaRating.watch_status, UserMediaRating.rating,
+            UserMediaRating.updated_at,
+        )
+        .join(UserMediaRating, UserMediaRating.media_id == MediaInList.media_id)
+        .join(MediaList, MediaList.id == MediaInList.list_id)
+        .where(UserMediaRating.watch_status.in_(FEED_STATUSES), is_member)
+    )
+
+    written = 0
+    for source in (added, statuses):
+        result = db.session.execute(db.insert(ActivityEvent).from_select(columns, source))
+        written += result.rowcount
+    return written
+
+
+def delete_activity(*criteria):
+    """Delete the events matching ``criteria`` together with their timeline copies."""
+    event_ids = db.select(ActivityEvent.id).where(*criteria)
+    db.session.execute(
+        db.delete(TimelineEntry)
+        .where(TimelineEntry.event_id.in_(event_ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        db.delete(ActivityEvent)
+        .where(*criteria)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# ---------------------------- Timelines ---------------------------- #
+def fan_out(event):
+    """Copy ``event`` into the timeline of every other member of its list."""
+    db.session.flush()  # event.id
+    recipient_ids = [
+        uid for (uid,) in db.session.execute(list_member_ids_query(event.list_id))
+        if uid != event.user_id
+    ]
+    if not recipient_ids:
+        return
+    db.session.execute(db.insert(TimelineEntry), [
+        {"user_id": uid, "event_id": event.id, "created_at": event.created_at}
+        for uid in recipient_ids
+    ])
+    drop_superseded(recipient_ids, *(
+        getattr(ActivityEvent, column) == getattr(event, column) for column in COLLABORATOR_FEED_KEY
+    ))
+    trim_timelines(recipient_ids)
+
+
+def drop_superseded(user_ids=None, *criteria):
+    """
+    Delete timeline entries (of ``user_ids``, or everyone) whose event a
+    newer event in the same timeline matches on COLLABORATOR_FEED_KEY.
+    ``criteria`` on ActivityEvent narrow the events checked.
+    """
+    newer_entry = aliased(TimelineEntry)
+    newer = aliased(ActivityEvent)
+    stale = (
+        db.select(TimelineEntry.id)
+        .join(ActivityEvent, ActivityEvent.id == TimelineEntry.event_id)
+        .where(
+            *criteria,
+            db.exists().where(
+                newer_entry.user_id == TimelineEntry.user_id,
+                newer.id == newer_entry.event_id,
+                *(getattr(newer, column) == getattr(ActivityEvent, column) for column in COLLABORATOR_FEED_KEY),
+                or_(
+                    newer.created_at > ActivityEvent.created_at,
+                    and_(newer.created_at == ActivityEvent.created_at, newer.id > ActivityEvent.id),
+                ),
+            ),
+        )
+    )
+    if user_ids is not None:
+        stale = stale.where(TimelineEntry.user_id.in_(user_ids))
+    db.session.execute(
+        db.delete(TimelineEntry)
+        .where(TimelineEntry.id.in_(stale))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def trim_timelines(user_ids):
+    """Keep only the newest FEED_TIMELINE_MAX entries of each user's timeline."""
+    keep = current_app.config["FEED_TIMELINE_MAX"]
+    for user_id in user_ids:
+        # Timestamp of the oldest entry we keep; None while under the cap
+        cutoff = db.session.execute(
+            db.select(TimelineEntry.created_at)
+            .where(TimelineEntry.user_id == user_id)
+            .order_by(TimelineEntry.created_at.desc())
+            .offset(keep - 1)
+            .limit(1)
+        ).scalar()
+        if cutoff is None:
+            continue
+        db.session.execute(
+            db.delete(TimelineEntry)
+            .where(TimelineEntry.user_id == user_id, TimelineEntry.created_at < cutoff)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def seed_timeline(user_id, list_id):
+    """Give a new list member the recent history of the list."""
+    if not fanout_enabled():
+        return
+    recent = (
+        db.select(ActivityEvent.id, ActivityEvent.created_at)
+        .where(ActivityEvent.list_id == list_id, ActivityEvent.user_id != user_id)
+        .order_by(ActivityEvent.created_at.desc())
+        .limit(current_app.config["FEED_TIMELINE_MAX"])
+        .subquery()
+    )
+    db.session.execute(db.insert(TimelineEntry).from_select(
+        ["user_id", "event_id", "created_at"],
+        db.select(db.literal(user_id), recent.c.id, recent.c.created_at),
+    ))
+    drop_superseded([user_id])
+    trim_timelines([user_id])
+
+
+def drop_list_from_timeline(user_id, list_id):
+    """Remove a list's events from a former member's timeline."""
+    db.session.execute(
+        db.delete(TimelineEntry)
+        .where(
+            TimelineEntry.user_id == user_id,
+            TimelineEntry.event_id.in_(db.select(ActivityEvent.id).where(ActivityEvent.list_id == list_id)),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def rebuild_timelines():
+    """
+    Rebuild every timeline from the event log, e.g. after turning FEED_FANOUT
+    on for an existing deployment. Returns the number of entries kept.
+    """
+    db.session.execute(db.delete(TimelineEntry))
+    members = db.union_all(
+        db.select(MediaList.id.label("list_id"), MediaList.owner_id.label("user_id")),
+        db.select(SharedList.list_id, SharedList.user_id),
+    ).subquery()
+    db.session.execute(db.insert(TimelineEntry).from_select(
+        ["user_id", "event_id", "created_at"],
+        db.select(members.c.user_id, ActivityEvent.id, ActivityEvent.created_at)
+        .join(members, members.c.list_id == ActivityEvent.list_id)
+        .where(members.c.user_id != ActivityEvent.user_id),
+    ))
+    drop_superseded()
+    user_ids = [uid for (uid,) in db.session.query(TimelineEntry.user_id).distinct()]
+    trim_timelines(user_ids)
+    return db.session.query(TimelineEntry).count()
+
+
+def superseded(list_ids, *same):
+    """
+    EXISTS clause true for an event that a newer event in ``list_ids`` matches
+    on every column named in ``same``. The feeds filter these out so only
+    the latest event per key is paged, whatever page it falls on.
+    """
+    newer = aliased(ActivityEvent)
+    return db.exists().where(
+        newer.list_id.in_(list_ids),
+        *(getattr(newer, column) == getattr(ActivityEvent, column) for column in same),
+        or_(
+            newer.created_at > ActivityEvent.created_at,
+            and_(newer.created_at == ActivityEvent.created_at, newer.id > ActivityEvent.id),
+        ),
+    )
+
+
+def collaborator_events_query(user_id):
+    """
+    Query of ``(ActivityEvent, MediaInList, Media, User, list name)`` rows for
+    other members' latest activity in the user's lists, plus the
+    ``(sort, id)`` columns to page it by. With fan-out this is the user's
+    timeline alone, already free of superseded events.
+    """
+    query = db.session.query(ActivityEvent, MediaInList, Media, User, MediaList.name)
+    if fanout_enabled():
+        query = (
+            query.select_from(TimelineEntry)
+            .join(ActivityEvent, ActivityEvent.id == TimelineEntry.event_id)
+            .filter(TimelineEntry.user_id == user_id)
+        )
+        sort_col, id_col = TimelineEntry.created_at, TimelineEntry.id
+    else:
+        sort_col, id_col = ActivityEvent.created_at, ActivityEvent.id
+    query = (
+        query
+        .join(MediaInList, MediaInList.id == ActivityEvent.media_in_list_id)
+        .join(Media, Media.id == ActivityEvent.media_id)
+        .join(User, User.id == ActivityEvent.user_id)
+        .join(MediaList, MediaList.id == ActivityEvent.list_id)
+    )
+    if fanout_enabled():
+        return query, sort_col, id_col
+
+    list_ids = list(get_accessible_list_ids(user_id))
+    query = query.filter(
+        ActivityEvent.user_id != user_id,
+        ~superseded(list_ids, *COLLABORATOR_FEED_KEY),
+    )
+    # One ix_activity_list_created range per list, merged in order
+    return union_per_value(query, ActivityEvent.list_id, list_ids), sort_col, id_col
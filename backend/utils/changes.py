@@ -0,0 +1,120 @@
+"""
+Per-list change log behind ``GET /lists/<id>/changes`` (delta sync).
+
+Every write that alters what a list view shows appends a ListChange row
+naming the entry or member it touched. The log only records *what* changed.
+The sync endpoint reads the rows after the client's cursor and serves the
+current state of those entries and members. An entry or member that no
+longer exists is reported as removed, so deletions need no tombstones.
+
+Cursors are ``(created_at, id)`` of the last row a client has seen. Rows
+are purged after LIST_CHANGES_RETENTION_DAYS (see utils.maintenance), which
+records the highest purged id on the list. Only a client whose cursor is
+below that watermark missed something and is told to reload the whole list.
+"""
+from datetime import datetime
+
+from sqlalchemy import func, insert, or_, text
+
+from extensions import db
+from models import ListChange, MediaInList, MediaList, UserMediaRating
+from utils.pagination import encode_cursor
+
+ITEM = "item"
+MEMBER = "member"
+
+
+def record_change(list_id, kind, ref_id):
+    """Log that one entry (``ITEM``) or member (``MEMBER``) of a list changed."""
+    db.session.add(ListChange(list_id=list_id, kind=kind, ref_id=ref_id))
+
+
+def record_changes(kind, rows):
+    """Log a change for every ``(list_id, ref_id)`` row of the SELECT ``rows``."""
+    rows = rows.subquery()
+    list_id, ref_id = rows.c
+    db.session.execute(insert(ListChange).from_select(
+        ["list_id", "kind", "ref_id", "created_at"],
+        db.select(list_id, db.literal(kind), ref_id, db.literal(datetime.utcnow())),
+    ))
+
+
+def record_member_change(list_ids, user_id):
+    """
+    Log that ``user_id`` joined, left or was renamed in ``list_ids`` (IDs or
+    a SELECT). The entries they added and the titles they rated change with
+    them, since those show their username or include their rating in the
+    average. Call this before deleting anything.
+    """
+    record_changes(MEMBER, db.select(MediaList.id, db.literal(user_id)).where(MediaList.id.in_(list_ids)))
+    record_changes(ITEM, db.select(MediaInList.list_id, MediaInList.id).where(
+        MediaInList.list_id.in_(list_ids),
+        or_(
+            MediaInList.added_by_id == user_id,
+            MediaInList.media_id.in_(
+                db.select(UserMediaRating.media_id).where(
+                    UserMediaRating.user_id == user_id, UserMediaRating.rating.is_not(None)
+                )
+            ),
+        ),
+    ))
+
+
+def reseed_change_ids():
+    """
+    Move the ListChange id sequence past every list's purge watermark. A
+    log purged empty before the table was AUTOINCREMENT would otherwise
+    restart at 1, below the watermark, and every sync would reset.
+    """
+    if db.engine.dialect.name != "sqlite":
+        return
+    floor = db.session.scalar(db.select(func.max(MediaList.changes_purged_id))) or 0
+    params = {"name": ListChange.__tablename__, "floor": floor}
+    updated = db.session.execute(
+        text("UPDATE sqlite_sequence SET seq = MAX(seq, :floor) WHERE name = :name"), params
+    ).rowcount
+    if not updated:
+        db.session.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :floor)"), params)
+
+
+def changes_cursor(lst):
+    """Cursor pointing at the newest change to a list."""
+    last = db.session.execute(
+        db.select(ListChange.created_at, ListChange.id)
+        .where(ListChange.list_id == lst.id)
+        .order_by(ListChange.id.desc())
+        .limit(1)
+    ).first()
+    if last is None:
+        # Nothing logged, or all of it purged: start from the watermark
+        return encode_cursor(datetime.utcnow(), lst.changes_purged_id)
+    return encode_cursor(*last)
+
+
+def read_changes(lst, since):
+    """
+    Entry and member IDs changed after the decoded cursor ``since``, plus
+    the new cursor: ``{"item_ids", "member_ids", "cursor"}``. Returns None
+    when changes after the cursor have been purged.
+    """
+    since_at, since_id = since
+    if since_id < lst.changes_purged_id:
+        return None
+
+    rows = db.session.execute(
+        db.select(ListChange.kind, ListChange.ref_id, func.max(ListChange.id), func.max(ListChange.created_at))
+        .where(ListChange.list_id == lst.id, ListChange.id > since_id)
+        .group_by(ListChange.kind, ListChange.ref_id)
+    ).all()
+
+    changed = {ITEM: [], MEMBER: []}
+    last_id, last_at = since_id, since_at
+    for kind, ref_id, max_id, max_at in rows:
+        changed.setdefault(kind, []).append(ref_id)
+        if max_id > last_id:
+            last_id, last_at = max_id, max_at
+    return {
+        "item_ids": changed[ITEM],
+        "member_ids": changed[MEMBER],
+        "cursor": encode_cursor(last_at, last_id),
+    }
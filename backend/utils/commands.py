@@ -0,0 +1,85 @@
+"""
+Flask CLI commands (``flask <command>``) for maintenance jobs.
+"""
+import json
+import click
+
+from extensions import db
+from utils.helpers import check_counters
+from utils.activity import backfill_activity, rebuild_timelines
+from utils.schema import ensure_schema
+from utils.maintenance import (
+    purge_verification_codes,
+    purge_list_changes,
+    collect_unreferenced_media,
+    backup_database,
+    MEDIA_GC_BATCH_SIZE,
+    MEDIA_GC_PAUSE,
+)
+
+
+def register_commands(app):
+    @app.cli.command("check-counters")
+    @click.option("--fix", is_flag=True, help="Rewrite any counters that have drifted.")
+    def check_counters_command(fix):
+        """Verify MediaList.member_count / item_count and User.list_count."""
+        mismatches = check_counters(fix=fix)
+        for mismatch in mismatches:
+            click.echo(json.dumps(mismatch))
+        if fix:
+            db.session.commit()
+        click.echo(f"{len(mismatches)} mismatch(es){' fixed' if fix and mismatches else ''}")
+
+    @app.cli.command("backfill-activity")
+    def backfill_activity_command():
+        """Seed the ActivityEvent log from existing list entries and ratings."""
+        written = backfill_activity()
+        db.session.commit()
+        click.echo(f"{written} event(s) written")
+
+    @app.cli.command("rebuild-timelines")
+    def rebuild_timelines_command():
+        """Rebuild the fan-out timelines from the event log (after enabling FEED_FANOUT)."""
+        kept = rebuild_timelines()
+        db.session.commit()
+        click.echo(f"{kept} timeline entr{'y' if kept == 1 else 'ies'} written")
+
+    @app.cli.command("ensure-schema")
+    @click.option("--force", is_flag=True, help="Run the DDL even if the stored fingerprint matches.")
+    def ensure_schema_command(force):
+        """Create / upgrade tables if the models changed since the last run."""
+        ran = ensure_schema(force=force)
+        click.echo("Schema updated" if ran else "Schema already current")
+
+    @app.cli.command("purge-verification-codes")
+    def purge_verification_codes_command():
+        """Delete verification codes past their validity window plus the retention margin."""
+        deleted = purge_verification_codes()
+        click.echo(f"{deleted} verification code(s) purged")
+
+    @app.cli.command("purge-list-changes")
+    def purge_list_changes_command():
+        """Delete delta-sync change log rows past LIST_CHANGES_RETENTION_DAYS."""
+        deleted = purge_list_changes()
+        click.echo(f"{deleted} list change(s) purged")
+
+    @app.cli.command("gc-media")
+    @click.option("--batch-size", default=MEDIA_GC_BATCH_SIZE, show_default=True)
+    @click.option("--pause", default=MEDIA_GC_PAUSE, show_default=True, help="Seconds to sleep between batches.")
+    @click.option("--dry-run", is_flag=True, help="Only count unreferenced media.")
+    def gc_media_command(batch_size, pause, dry_run):
+        """Delete Media rows no list, rating or activity event references."""
+        result = collect_unreferenced_media(batch_size=batch_size, pause=pause, dry_run=dry_run)
+        if dry_run:
+            click.echo(f"{result['unreferenced']} unreferenced media row(s)")
+        else:
+            click.echo(f"{result['deleted']} media row(s) deleted in {result['batches']} batch(es)")
+
+    @app.cli.command("backup-db")
+    @click.argument("destination", required=False)
+    @click.option("--pages", type=int, help="Pages copied per step (default BACKUP_PAGES_PER_STEP).")
+    @click.option("--sleep", type=float, help="Seconds between steps (default BACKUP_STEP_SLEEP).")
+    def backup_db_command(destination, pages, sleep):
+        """Back up the SQLite database online and verify the copy."""
+        result = backup_database(destination, pages=pages, sleep=sleep)
+        click.echo(json.dumps(result))
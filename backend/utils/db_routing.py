@@ -0,0 +1,57 @@
+"""
+Read-replica routing for the SQLAlchemy session.
+
+When ``DATABASE_READ_URL`` is configured it is registered as the
+``replica`` bind. Views wrapped in ``@read_only`` send their plain SELECTs
+there; everything else (writes, flushes, SELECT ... FOR UPDATE, and every
+request that isn't marked) keeps using the primary.
+"""
+from functools import wraps
+
+from flask import g, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql import Select
+
+REPLICA_BIND_KEY = "replica"
+# Session.info key holding the single-writer unit being run (utils.single_writer)
+WRITE_UNIT_KEY = "write_unit"
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+            and has_request_context()
+            and g.get("_read_only_request")
+        ):
+            replica = self._db.engines.get(REPLICA_BIND_KEY)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    # Inside a single-writer batch a view's commit only flushes and its
+    # rollback only undoes its own savepoint; the writer commits the batch
+    def commit(self):
+        if self.info.get(WRITE_UNIT_KEY) is not None:
+            self.flush()
+            return
+        super().commit()
+
+    def rollback(self):
+        unit = self.info.get(WRITE_UNIT_KEY)
+        if unit is not None:
+            unit.rollback(self)
+            return
+        super().rollback()
+
+
+def read_only(view):
+    """Mark a view as read-only so its SELECTs may be served by the replica."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g._read_only_request = True
+        return view(*args, **kwargs)
+    return wrapper
@@ -7,9 +7,6 @@ CSS, and plain-text bodies are identical to your original code – the
 only difference is that we now pull config / logger from
 `flask.current_app`.
 """
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from flask import current_app
 
 
@@ -26,6 +23,11 @@ def send_verification_email(to_email: str,
     :param username:  Recipient’s username (for personalisation)
     :param purpose:   'email_verification' | 'password_reset'
     """
+    # Deferred so worker start-up doesn't pay for the mail stack
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+
     try:
         msg = MIMEMultipart("alternative")
         msg["From"] = current_app.config["MAIL_USERNAME"]
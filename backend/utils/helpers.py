@@ -2,23 +2,48 @@
 Helper utilities that multiple blueprints rely on.
 No logic has been changed – only moved.
 """
+import hashlib
+import importlib.util
 import math
+import sys
 from datetime import datetime
 from flask import request, current_app
+from sqlalchemy import func, union, update
 from sqlalchemy.exc import SQLAlchemyError
 from werkzeug.exceptions import NotFound
 
 from extensions import db
-from models import MediaList, SharedList
+from models import MediaList, SharedList, MediaInList, User
 from flask_limiter.errors import RateLimitExceeded
 
 
+# ------------------------- Imports ------------------------- #
+def lazy_import(name):
+    """
+    Return module ``name`` without executing it until an attribute is first
+    used. Keeps heavy, request-time-only dependencies out of worker start-up.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
 # ------------------- List / User count helpers ------------------- #
+# MediaList.member_count / item_count and User.list_count are denormalised
+# so quota checks and list summaries never need aggregate queries. Every
+# write path adjusts them in the same transaction via the helpers below,
+# which also advance MediaList.version for the lists they touch.
 def get_list_user_count(list_id):
     """Return owner + number of shared users for a given list."""
     try:
-        shared_count = SharedList.query.filter_by(list_id=list_id).count()
-        return shared_count + 1  # +1 for owner
+        count = db.session.query(MediaList.member_count).filter(MediaList.id == list_id).scalar()
+        return count or 0
     except SQLAlchemyError as e:
         current_app.logger.error(f"Error counting list users: {e}")
         return 0
@@ -27,14 +52,165 @@ def get_list_user_count(list_id):
 def get_user_list_count(user_id):
     """Return how many lists (owned + shared) a user is part of."""
     try:
-        owned = MediaList.query.filter_by(owner_id=user_id).count()
-        shared = SharedList.query.filter_by(user_id=user_id).count()
-        return owned + shared
+        count = db.session.query(User.list_count).filter(User.id == user_id).scalar()
+        return count or 0
     except SQLAlchemyError as e:
         current_app.logger.error(f"Error counting user lists: {e}")
         return 0
 
 
+def adjust_list_counters(list_id, members=0, items=0):
+    """Atomically add ``members`` / ``items`` to a list's counters."""
+    values = {}
+    if members:
+        values["member_count"] = MediaList.member_count + members
+    if items:
+        values["item_count"] = MediaList.item_count + items
+    if values:
+        db.session.execute(
+            update(MediaList).where(MediaList.id == list_id)
+            .values(version=MediaList.version + 1, **values)
+        )
+
+
+def bump_list_versions(list_ids):
+    """Advance ``version`` for lists whose contents changed (caller commits)."""
+    db.session.execute(
+        update(MediaList)
+        .where(MediaList.id.in_(list_ids))
+        .values(version=MediaList.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def user_list_ids_query(user_id):
+    """SELECT of every list ID the user owns or has been shared into."""
+    return union(
+        db.select(MediaList.id).where(MediaList.owner_id == user_id),
+        db.select(SharedList.list_id).where(SharedList.user_id == user_id),
+    )
+
+
+def adjust_user_list_counts(user_ids, delta):
+    """Atomically add ``delta`` to ``list_count`` for each user."""
+    user_ids = list(user_ids)
+    if user_ids and delta:
+        db.session.execute(
+            update(User).where(User.id.in_(user_ids)).values(list_count=User.list_count + delta)
+        )
+
+
+def refresh_item_counts(list_ids):
+    """Recompute ``item_count`` for the given lists with one correlated UPDATE."""
+    list_ids = list(list_ids)
+    if list_ids:
+        db.session.execute(
+            update(MediaList)
+            .where(MediaList.id.in_(list_ids))
+            .values(version=MediaList.version + 1, item_count=(
+                db.select(func.count(MediaInList.id))
+                .where(MediaInList.list_id == MediaList.id)
+                .scalar_subquery()
+            ))
+            .execution_options(synchronize_session=False)
+        )
+
+
+def check_counters(fix=False):
+    """
+    Compare the denormalised counters with real COUNTs.
+    Returns a list of mismatch dicts; with ``fix=True`` they are corrected
+    (caller commits).
+    """
+    shared_counts = (
+        db.select(SharedList.list_id, func.count().label("n"))
+        .group_by(SharedList.list_id).subquery()
+    )
+    item_counts = (
+        db.select(MediaInList.list_id, func.count().label("n"))
+        .group_by(MediaInList.list_id).subquery()
+    )
+    list_rows = db.session.execute(
+        db.select(
+            MediaList.id,
+            MediaList.member_count,
+            MediaList.item_count,
+            (func.coalesce(shared_counts.c.n, 0) + 1).label("real_members"),
+            func.coalesce(item_counts.c.n, 0).label("real_items"),
+        )
+        .outerjoin(shared_counts, shared_counts.c.list_id == MediaList.id)
+        .outerjoin(item_counts, item_counts.c.list_id == MediaList.id)
+    ).all()
+
+    owned_counts = (
+        db.select(MediaList.owner_id.label("user_id"), func.count().label("n"))
+        .group_by(MediaList.owner_id).subquery()
+    )
+    joined_counts = (
+        db.select(SharedList.user_id, func.count().label("n"))
+        .group_by(SharedList.user_id).subquery()
+    )
+    user_rows = db.session.execute(
+        db.select(
+            User.id,
+            User.list_count,
+            (func.coalesce(owned_counts.c.n, 0) + func.coalesce(joined_counts.c.n, 0)).label("real_lists"),
+        )
+        .outerjoin(owned_counts, owned_counts.c.user_id == User.id)
+        .outerjoin(joined_counts, joined_counts.c.user_id == User.id)
+    ).all()
+
+    mismatches = []
+    for row in list_rows:
+        if (row.member_count, row.item_count) != (row.real_members, row.real_items):
+            mismatches.append({
+                "list_id": row.id,
+                "member_count": [row.member_count, row.real_members],
+                "item_count": [row.item_count, row.real_items],
+            })
+            if fix:
+                db.session.execute(
+                    update(MediaList).where(MediaList.id == row.id)
+                    .values(member_count=row.real_members, item_count=row.real_items)
+                )
+    for row in user_rows:
+        if row.list_count != row.real_lists:
+            mismatches.append({"user_id": row.id, "list_count": [row.list_count, row.real_lists]})
+            if fix:
+                db.session.execute(
+                    update(User).where(User.id == row.id).values(list_count=row.real_lists)
+                )
+    return mismatches
+
+
+# ------------------- Conditional GET helpers ------------------- #
+# List views are tagged with the list's version (plus the viewer, since
+# they carry per-user fields), so a poll that finds nothing new is answered
+# with a 304 before any serialisation or TMDB work happens. The creation
+# time tells a list apart from an earlier one that had the same id.
+# ``variant`` holds a view's validated query parameters (sort, page, ...),
+# so each of its variants gets its own tag.
+def list_etag(lst, user_id, *variant):
+    etag = f"list-{lst.id}-{lst.created_at:%Y%m%d%H%M%S%f}-v{lst.version}-u{user_id}"
+    if variant:
+        etag += "-" + hashlib.sha1(repr(variant).encode()).hexdigest()[:16]
+    return etag
+
+
+def not_modified(etag):
+    """A 304 response if the client already holds ``etag``, else None."""
+    if request.if_none_match.contains_weak(etag):
+        return with_etag(current_app.response_class(status=304), etag)
+    return None
+
+
+def with_etag(response, etag):
+    """Tag ``response`` and make browsers revalidate it on every use."""
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
 # ------------------- Rate-limit helper utils ------------------- #
 def get_retry_after():
     """
@@ -0,0 +1,68 @@
+"""
+Prebuilt statements for the hottest lookups.
+
+Each lookup is a ``lambda_stmt``: SQLAlchemy builds and compiles the
+statement once per call site and afterwards only binds fresh parameter
+values, where the ``Model.query.filter_by(...)`` API rebuilds the whole
+construct and re-derives its cache key on every call. Lookups whose
+callers only read a value or two return plain rows / scalars instead of
+hydrating ORM entities.
+"""
+from sqlalchemy import func, lambda_stmt, select, union_all
+
+from extensions import db
+from models import MediaInList, MediaList, SharedList, User, UserMediaRating
+
+
+# ------------------------- Entities ------------------------- #
+def find_rating(user_id, media_id):
+    stmt = lambda_stmt(lambda: select(UserMediaRating).where(
+        UserMediaRating.user_id == user_id, UserMediaRating.media_id == media_id
+    ))
+    return db.session.scalars(stmt).first()
+
+
+def find_list_entry(list_id, media_id):
+    """The MediaInList row for a media item in a list, if present."""
+    stmt = lambda_stmt(lambda: select(MediaInList).where(
+        MediaInList.list_id == list_id, MediaInList.media_id == media_id
+    ))
+    return db.session.scalars(stmt).first()
+
+
+# ------------------------- Lightweight rows ------------------------- #
+def get_username(user_id):
+    stmt = lambda_stmt(lambda: select(User.username).where(User.id == user_id))
+    return db.session.execute(stmt).scalar()
+
+
+def get_list_member_ids(list_id):
+    """Owner first, then shared users."""
+    stmt = lambda_stmt(lambda: union_all(
+        select(MediaList.owner_id).where(MediaList.id == list_id),
+        select(SharedList.user_id).where(SharedList.list_id == list_id),
+    ))
+    return [user_id for (user_id,) in db.session.execute(stmt)]
+
+
+def get_rating_summary(media_id, list_id=None):
+    """``(average, count)`` row of non-null ratings, optionally limited to a list's members."""
+    if list_id is None:
+        stmt = lambda_stmt(lambda: select(
+            func.avg(UserMediaRating.rating), func.count(UserMediaRating.id)
+        ).where(
+            UserMediaRating.media_id == media_id,
+            UserMediaRating.rating.is_not(None),
+        ))
+    else:
+        stmt = lambda_stmt(lambda: select(
+            func.avg(UserMediaRating.rating), func.count(UserMediaRating.id)
+        ).where(
+            UserMediaRating.media_id == media_id,
+            UserMediaRating.rating.is_not(None),
+            UserMediaRating.user_id.in_(union_all(
+                select(MediaList.owner_id).where(MediaList.id == list_id),
+                select(SharedList.user_id).where(SharedList.list_id == list_id),
+            )),
+        ))
+    return db.session.execute(stmt).one()
@@ -0,0 +1,201 @@
+"""
+Housekeeping jobs.
+
+Each job is exposed as a ``flask`` CLI command (see utils.commands) so it
+can be scheduled from cron, e.g.
+
+    */30 * * * *  cd backend && flask purge-verification-codes
+
+Jobs work in small committed batches so no single statement holds the
+write lock for long.
+"""
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import update
+
+from config import VERIFICATION_CODE_TTL
+from extensions import db
+from models import VerificationCode, Media, MediaInList, MediaList, UserMediaRating, ActivityEvent, ListChange
+
+PURGE_BATCH_SIZE = 1000
+MEDIA_GC_BATCH_SIZE = 500
+MEDIA_GC_PAUSE = 0.05  # seconds between batches, lets queued writers in
+
+
+# --------------------- Verification codes --------------------- #
+def purge_verification_codes(batch_size=PURGE_BATCH_SIZE):
+    """
+    Delete verification codes that expired more than
+    VERIFICATION_CODE_RETENTION_HOURS ago. Returns the number deleted.
+    """
+    retention = timedelta(hours=current_app.config["VERIFICATION_CODE_RETENTION_HOURS"])
+    cutoff = datetime.utcnow() - VERIFICATION_CODE_TTL - retention
+
+    deleted = 0
+    while True:
+        ids = db.session.scalars(
+            db.select(VerificationCode.id)
+            .where(VerificationCode.created_at < cutoff)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        db.session.execute(
+            db.delete(VerificationCode)
+            .where(VerificationCode.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            break
+    return deleted
+
+
+# ---------------------- List change log ---------------------- #
+def purge_list_changes(batch_size=PURGE_BATCH_SIZE):
+    """
+    Delete delta-sync change log rows older than LIST_CHANGES_RETENTION_DAYS,
+    advancing each list's ``changes_purged_id`` past them so cursors that
+    needed them are reset. Returns the number deleted.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=current_app.config["LIST_CHANGES_RETENTION_DAYS"])
+
+    deleted = 0
+    while True:
+        rows = db.session.execute(
+            db.select(ListChange.id, ListChange.list_id)
+            .where(ListChange.created_at < cutoff)
+            .order_by(ListChange.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        ids = [change_id for change_id, _ in rows]
+        watermarks = {}
+        for change_id, list_id in rows:
+            watermarks[list_id] = max(watermarks.get(list_id, 0), change_id)
+        for list_id, change_id in watermarks.items():
+            db.session.execute(
+                update(MediaList)
+                .where(MediaList.id == list_id, MediaList.changes_purged_id < change_id)
+                .values(changes_purged_id=change_id)
+            )
+        db.session.execute(
+            db.delete(ListChange)
+            .where(ListChange.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            break
+    return deleted
+
+
+# ------------------------- Media GC ------------------------- #
+def _media_unreferenced():
+    """Media rows no list entry, rating or activity event points at."""
+    return db.and_(
+        ~db.exists().where(MediaInList.media_id == Media.id),
+        ~db.exists().where(UserMediaRating.media_id == Media.id),
+        ~db.exists().where(ActivityEvent.media_id == Media.id),
+    )
+
+
+def collect_unreferenced_media(batch_size=MEDIA_GC_BATCH_SIZE, pause=MEDIA_GC_PAUSE, dry_run=False):
+    """
+    Delete Media rows nothing references any more, ``batch_size`` at a time
+    with a commit and a ``pause`` between batches.
+    Returns ``{"deleted": n, "batches": n}``, or ``{"unreferenced": n}`` for a dry run.
+    """
+    unreferenced = _media_unreferenced()
+    if dry_run:
+        count = db.session.scalar(db.select(db.func.count(Media.id)).where(unreferenced))
+        return {"unreferenced": count}
+
+    deleted = batches = 0
+    last_id = 0
+    while True:
+        ids = db.session.scalars(
+            db.select(Media.id)
+            .where(Media.id > last_id, unreferenced)
+            .order_by(Media.id)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        last_id = ids[-1]
+        # Re-check in the DELETE itself: a title may have been re-added since the SELECT
+        result = db.session.execute(
+            db.delete(Media)
+            .where(Media.id.in_(ids), unreferenced)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        deleted += result.rowcount
+        batches += 1
+        if len(ids) < batch_size:
+            break
+        time.sleep(pause)
+    return {"deleted": deleted, "batches": batches}
+
+
+# ------------------------- Backups ------------------------- #
+def backup_database(destination=None, pages=None, sleep=None):
+    """
+    Copy the primary SQLite database with the online backup API.
+
+    The copy is made ``pages`` pages per step with ``sleep`` seconds between
+    steps, so writers keep working while it runs (SQLite restarts the copy
+    if another connection writes mid-way). The result is written to a
+    ``.partial`` file, checked with ``PRAGMA integrity_check`` and only then
+    moved into place. Returns a summary dict; raises ValueError for
+    non-SQLite databases and RuntimeError if the integrity check fails.
+    """
+    config = current_app.config
+    engine = db.engine
+    if engine.dialect.name != "sqlite" or not engine.url.database or engine.url.database == ":memory:":
+        raise ValueError("Online backups are only supported for file-based SQLite databases")
+
+    if destination is None:
+        backup_dir = config.get("BACKUP_DIR") or os.path.join(current_app.instance_path, "backups")
+        os.makedirs(backup_dir, exist_ok=True)
+        destination = os.path.join(backup_dir, f"whirlwatch-{datetime.utcnow():%Y%m%d-%H%M%S}.db")
+    pages = pages or config["BACKUP_PAGES_PER_STEP"]
+    sleep = config["BACKUP_STEP_SLEEP"] if sleep is None else sleep
+
+    partial = f"{destination}.partial"
+    started = time.perf_counter()
+    source = target = None
+    try:
+        source = engine.raw_connection()
+        target = sqlite3.connect(partial)
+        source.driver_connection.backup(target, pages=pages, sleep=sleep)
+        integrity = target.execute("PRAGMA integrity_check").fetchone()[0]
+        page_count = target.execute("PRAGMA page_count").fetchone()[0]
+        target.close()
+        target = None
+        if integrity != "ok":
+            raise RuntimeError(f"Backup failed integrity check: {integrity}")
+        os.replace(partial, destination)
+    finally:
+        if target is not None:
+            target.close()
+        if source is not None:
+            source.close()
+        # Never leave a half-written copy behind
+        if os.path.exists(partial):
+            os.remove(partial)
+
+    return {
+        "path": os.path.abspath(destination),
+        "pages": page_count,
+        "bytes": os.path.getsize(destination),
+        "seconds": round(time.perf_counter() - started, 3),
+        "integrity": integrity,
+    }
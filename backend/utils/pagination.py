@@ -0,0 +1,106 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Pages are ordered by a stable ``(sort value, id)`` key, descending - usually
+a timestamp (newest first), sometimes a number such as a ranking score. The
+cursor handed to clients is an opaque, URL-safe encoding of the last key
+returned, so the next page is an indexed range read rather than an OFFSET.
+"""
+import base64
+import json
+from datetime import datetime
+
+from flask import request
+from sqlalchemy import and_, or_
+from werkzeug.exceptions import BadRequest
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Beyond this many keys compiling and merging the arms costs more than the sort
+UNION_ARMS_MAX = 16
+
+
+def get_page_limit(default=DEFAULT_PAGE_SIZE):
+    """Read ``?limit=`` (clamped to MAX_PAGE_SIZE). ``default=None`` means unpaginated."""
+    raw = request.args.get("limit")
+    if raw is None:
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise BadRequest("limit must be an integer")
+    if limit < 1:
+        raise BadRequest("limit must be at least 1")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def encode_cursor(*key):
+    """Encode a key tuple whose first element is a datetime or a number."""
+    value, *rest = key
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([value, *rest], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Inverse of ``encode_cursor``; returns None for a missing cursor."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, *rest = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        return (value, *rest)
+    except (ValueError, TypeError):
+        raise BadRequest("Invalid cursor")
+
+
+def get_page_cursor():
+    return decode_cursor(request.args.get("cursor"))
+
+
+def union_per_value(query, column, values):
+    """
+    ``query.filter(column.in_(values))`` as one UNION ALL arm per value.
+
+    An ``IN`` over several keys can't be read in index order, so SQLite sorts
+    every match in a temp B-tree before returning the first row. With one arm
+    per key each arm walks its own ``(column, sort, id)`` index range and the
+    planner merges the already-ordered arms (``MERGE (UNION ALL)``), so an
+    ordered LIMIT stops after reading roughly a page per arm.
+    """
+    values = list(values)
+    if not 2 <= len(values) <= UNION_ARMS_MAX:
+        return query.filter(column.in_(values))
+    first, *rest = [query.filter(column == value) for value in values]
+    return first.union_all(*rest)
+
+
+def iter_keyset(query, sort_col, id_col, after=None, batch_size=DEFAULT_PAGE_SIZE + 1):
+    """
+    Yield ``(row, (sort_value, id_value))`` from ``query`` in descending
+    ``(sort_col, id_col)`` order, strictly after the ``after`` key.
+
+    Rows are fetched lazily in batches, so a caller that stops early (after
+    filling a page, for example) never reads more than it needs.
+    """
+    query = query.add_columns(sort_col.label("page_sort_key"), id_col.label("page_row_id"))
+    query = query.order_by(sort_col.desc(), id_col.desc())
+
+    while True:
+        batch_query = query
+        if after is not None:
+            batch_query = batch_query.filter(or_(
+                sort_col < after[0],
+                and_(sort_col == after[0], id_col < after[1]),
+            ))
+        rows = batch_query.limit(batch_size).all()
+        for row in rows:
+            *entities, sort_value, row_id = row
+            after = (sort_value, row_id)
+            yield tuple(entities), after
+        if len(rows) < batch_size:
+            return
+
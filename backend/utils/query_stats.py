@@ -0,0 +1,80 @@
+"""
+Per-request SQL statistics and N+1 detection.
+
+Counts the statements a request executes and the time spent in the
+database, returns both as ``X-DB-Query-Count`` / ``X-DB-Query-Time`` headers
+and logs them. Statements are also grouped by shape (literal values and
+expanded IN lists collapsed); a shape that repeats at least
+QUERY_STATS_N_PLUS_ONE_THRESHOLD times is logged as a probable N+1 pattern
+together with the endpoint that issued it.
+"""
+import re
+import time
+from collections import Counter
+
+from flask import g, request, current_app, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_IN_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement):
+    """Normalise a SQL string so that repeated lookups compare equal."""
+    shape = _IN_LIST.sub("(?)", statement)
+    shape = _LITERAL.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "_query_stats" in g:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started")
+    if not started or not has_request_context() or "_query_stats" not in g:
+        return
+    stats = g._query_stats
+    stats["count"] += 1
+    stats["time"] += time.perf_counter() - started.pop()
+    stats["shapes"][statement_shape(statement)] += 1
+
+
+def register_query_stats(app):
+    if not (app.config.get("QUERY_STATS") or app.debug):
+        return
+
+    # Engine-level listeners cover the primary and any replica bind
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def start_query_stats():
+        g._query_stats = {"count": 0, "time": 0.0, "shapes": Counter()}
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.pop("_query_stats", None)
+        if stats is None:
+            return response
+
+        elapsed_ms = stats["time"] * 1000
+        response.headers["X-DB-Query-Count"] = str(stats["count"])
+        response.headers["X-DB-Query-Time"] = f"{elapsed_ms:.2f}"
+        current_app.logger.debug(
+            f"{request.method} {request.path} ({request.endpoint}): "
+            f"{stats['count']} queries in {elapsed_ms:.2f}ms"
+        )
+
+        threshold = current_app.config.get("QUERY_STATS_N_PLUS_ONE_THRESHOLD", 5)
+        for shape, repeats in stats["shapes"].most_common():
+            if repeats < threshold:
+                break
+            current_app.logger.warning(
+                f"Probable N+1 in {request.endpoint}: {repeats}x {shape[:300]}"
+            )
+        return response
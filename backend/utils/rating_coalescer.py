@@ -0,0 +1,239 @@
+"""
+Opt-in coalescing of rapid rating updates.
+
+The rating control fires ``PUT /lists/<id>/media/<id>`` on every keystroke
+or slider move, and each one used to commit on its own. With
+RATING_COALESCE_MS set, the route queues the change here instead: changes
+to the same (user, media) pair arriving within the window are merged and
+applied by a background flusher in one transaction, with one activity
+event and one ``last_updated`` bump.
+
+Any other request from the same user first applies that user's pending
+changes, so they always read their own writes. Other members see the new
+value at most one window later. The queue is per process, so this mode
+suits a single worker (threads are fine) - with several worker processes
+a user's next request may land on a process that has nothing queued.
+With SINGLE_WRITER on, the merged changes are committed by the single
+writer like any other write.
+
+A batch that fails with a transient database error is queued again, ahead
+of any changes that arrived meanwhile, and retried after a growing delay
+up to RATING_COALESCE_RETRIES times. Only then, or on any other error, are
+its changes dropped (and logged), since the PUTs have already returned.
+"""
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+
+from flask import request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import update
+from sqlalchemy.exc import OperationalError
+
+from extensions import db
+from models import MediaInList, MediaList
+from utils.activity import record_status
+from utils.ratings import update_user_rating
+from utils.single_writer import single_writer
+
+logger = logging.getLogger(__name__)
+
+# The endpoint whose writes are queued; it must not flush the queue itself
+COALESCED_ENDPOINT = "lists_bp.update_media_status"
+
+
+class _Pending:
+    __slots__ = ("ops", "entries", "due", "attempts")
+
+    def __init__(self, due):
+        self.ops = []  # (watch_status, rating) in arrival order
+        self.entries = {}  # list_id -> MediaInList id the change came through
+        self.due = due
+        self.attempts = 0  # failed applies so far
+
+
+def apply_rating_changes(changes):
+    """
+    Apply ``{(user_id, media_id): _Pending}`` in the current session and
+    commit once. Replays each queued change through ``update_user_rating``
+    so the merged result matches applying them one by one.
+    """
+    now = datetime.utcnow()
+    for (user_id, media_id), pending in changes.items():
+        user_rating = None
+        for watch_status, rating in pending.ops:
+            user_rating = update_user_rating(user_id, media_id, watch_status=watch_status, rating=rating)
+        for list_id, entry_id in pending.entries.items():
+            entry = db.session.get(MediaInList, entry_id)
+            if entry is None:
+                continue  # removed from the list while the change was queued
+            record_status(entry, user_rating)
+            entry.last_updated = now
+            db.session.execute(
+                update(MediaList).where(MediaList.id == list_id).values(last_updated=now)
+            )
+    db.session.commit()
+
+
+class RatingCoalescer:
+    def __init__(self):
+        self.window = 0.0
+        self.max_retries = 5
+        self._app = None
+        self._pending = {}  # (user_id, media_id) -> _Pending
+        self._applying = {}  # user_id -> batches in flight
+        self._cond = threading.Condition()
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return self.window > 0
+
+    def has_pending(self):
+        return bool(self._pending) or bool(self._applying)
+
+    def submit(self, user_id, media_id, list_id, entry_id, watch_status=None, rating=None):
+        """Queue one change; it is applied within ``window`` seconds."""
+        with self._cond:
+            key = (user_id, media_id)
+            pending = self._pending.get(key)
+            if pending is None:
+                # The window runs from the first change, so a long burst
+                # still lands every ``window`` seconds rather than at its end
+                pending = self._pending[key] = _Pending(time.monotonic() + self.window)
+            if watch_status is None and pending.ops and pending.ops[-1][0] is None:
+                # Rating-only changes don't depend on each other; keep the last
+                pending.ops[-1] = (None, rating)
+            else:
+                pending.ops.append((watch_status, rating))
+            pending.entries[list_id] = entry_id
+            self._start()
+            self._cond.notify_all()
+
+    def _take(self, predicate):
+        """Claim pending changes (caller holds the lock) for users not already being applied."""
+        batch = {
+            key: pending for key, pending in self._pending.items()
+            if key[0] not in self._applying and predicate(key, pending)
+        }
+        for key in batch:
+            del self._pending[key]
+        for user_id in {key[0] for key in batch}:
+            self._applying[user_id] = self._applying.get(user_id, 0) + 1
+        return batch
+
+    def _release(self, batch):
+        with self._cond:
+            for user_id in {key[0] for key in batch}:
+                self._applying[user_id] -= 1
+                if not self._applying[user_id]:
+                    del self._applying[user_id]
+            self._cond.notify_all()
+
+    def _requeue(self, batch):
+        """
+        Put a failed batch back, ahead of changes queued for the same keys
+        since. Returns the keys that are out of retries and were dropped.
+        """
+        dropped = []
+        with self._cond:
+            for key, failed in batch.items():
+                failed.attempts += 1
+                if failed.attempts > self.max_retries:
+                    dropped.append(key)
+                    continue
+                newer = self._pending.get(key)
+                if newer is not None:
+                    failed.ops.extend(newer.ops)
+                    failed.entries.update(newer.entries)
+                failed.due = time.monotonic() + self.window * failed.attempts
+                self._pending[key] = failed
+        return dropped
+
+    def _apply(self, batch):
+        try:
+            if single_writer.enabled:
+                # Commit with the writer's next batch rather than race it for the lock
+                single_writer.call(apply_rating_changes, batch)
+            else:
+                apply_rating_changes(batch)
+        except OperationalError as e:
+            db.session.rollback()
+            dropped = self._requeue(batch)
+            logger.warning(f"Retrying {len(batch) - len(dropped)} coalesced rating change(s): {e}")
+            if dropped:
+                logger.error(f"Dropped coalesced rating changes for {dropped} after {self.max_retries} retries")
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to apply {len(batch)} coalesced rating change(s): {e}")
+        finally:
+            self._release(batch)
+
+    def flush_user(self, user_id):
+        """Apply a user's queued changes now (inside a request / app context)."""
+        with self._cond:
+            # Wait for a batch the flusher already claimed, then take the rest
+            while user_id in self._applying:
+                self._cond.wait()
+            batch = self._take(lambda key, pending: key[0] == user_id)
+        if batch:
+            self._apply(batch)
+
+    def flush_all(self):
+        # Loop, since a batch that fails transiently is queued again
+        while True:
+            with self._cond:
+                while self._applying:
+                    self._cond.wait()
+                batch = self._take(lambda key, pending: True)
+            if not batch:
+                return
+            with self._app.app_context():
+                self._apply(batch)
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="rating-coalescer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    batch = self._take(lambda key, pending: pending.due <= now)
+                    if batch:
+                        break
+                    waiting = [p.due for k, p in self._pending.items() if k[0] not in self._applying]
+                    self._cond.wait(max(min(waiting) - now, 0) if waiting else None)
+            with self._app.app_context():
+                self._apply(batch)
+
+
+rating_coalescer = RatingCoalescer()
+
+
+def _read_your_writes():
+    """Apply the caller's queued rating changes before anything else they do."""
+    if not rating_coalescer.has_pending() or request.endpoint == COALESCED_ENDPOINT:
+        return
+    try:
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+    except Exception:
+        return  # the view's own @jwt_required reports bad tokens
+    if user_id is not None:
+        rating_coalescer.flush_user(user_id)
+
+
+def register_rating_coalescer(app):
+    if not app.config.get("RATING_COALESCE_MS"):
+        return
+    rating_coalescer.window = app.config["RATING_COALESCE_MS"] / 1000
+    rating_coalescer.max_retries = app.config["RATING_COALESCE_RETRIES"]
+    rating_coalescer._app = app
+    app.before_request(_read_your_writes)
+    # Don't drop queued changes on a clean shutdown
+    atexit.register(rating_coalescer.flush_all)
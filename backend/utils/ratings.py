@@ -1,37 +1,200 @@
 """
 Utility functions for handling media ratings
 """
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from sqlalchemy import func
+from sqlalchemy import func, literal, true, tuple_, union
+from sqlalchemy.exc import IntegrityError
 from extensions import db
-from models import Media, UserMediaRating, MediaInList, SharedList, MediaList
+from models import Media, UserMediaRating, MediaInList, SharedList, MediaList, User
+from utils.lookups import get_list_member_ids, get_rating_summary
+from utils.helpers import bump_list_versions, user_list_ids_query
+from utils.changes import ITEM, record_changes
+
+UPSERT_CHUNK_SIZE = 500
+WATCH_STATUSES = ("not_watched", "in_progress", "completed")
+
+# list_id -> (version, distribution); an entry is valid while the list's
+# version is unchanged, so writers only have to drop it when the list goes.
+# List ids are never reused (MediaList is AUTOINCREMENT).
+DISTRIBUTION_CACHE_SIZE = 256
+_distribution_cache = OrderedDict()
+_distribution_lock = threading.Lock()
+
+
+def _upsert_insert(model):
+    """
+    Return the dialect's ``insert`` construct if it supports
+    ``ON CONFLICT ... RETURNING``, otherwise None (caller falls back).
+    """
+    dialect = db.session.get_bind().dialect
+    if not getattr(dialect, "insert_returning", False):
+        return None
+    if dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    return insert(model)
+
+
+def _upsert_returning(model, rows, conflict_cols):
+    """
+    INSERT ``rows`` and return the ORM objects for every key, whether new or
+    pre-existing. ON CONFLICT DO NOTHING RETURNING yields the rows it
+    created; keys that already existed are read back with one SELECT, so
+    existing rows are never rewritten and concurrent creators never trip
+    the unique constraint.
+    """
+    insert = _upsert_insert(model)
+    if insert is None:
+        return None
+
+    key_cols = [getattr(model, col) for col in conflict_cols]
+    results = []
+    # Chunk so large batches stay under SQLite's bound-parameter limit
+    for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        chunk = rows[i:i + UPSERT_CHUNK_SIZE]
+        stmt = (
+            insert.values(chunk)
+            .on_conflict_do_nothing(index_elements=conflict_cols)
+            .returning(model)
+        )
+        created = db.session.scalars(stmt, execution_options={"populate_existing": True}).all()
+        results.extend(created)
+        if len(created) < len(chunk):
+            created_keys = {tuple(getattr(obj, col) for col in conflict_cols) for obj in created}
+            existing_keys = [
+                key for key in (tuple(row[col] for col in conflict_cols) for row in chunk)
+                if key not in created_keys
+            ]
+            results.extend(db.session.scalars(
+                db.select(model).where(tuple_(*key_cols).in_(existing_keys))
+            ).all())
+    return results
+
+
+def _get_or_create_fallback(model, lookup, defaults):
+    """Portable SELECT-then-INSERT inside a savepoint for dialects without upsert."""
+    obj = model.query.filter_by(**lookup).first()
+    if obj:
+        return obj
+    try:
+        with db.session.begin_nested():
+            obj = model(**lookup, **defaults)
+            db.session.add(obj)
+    except IntegrityError:
+        # Lost the race – the row exists now
+        obj = model.query.filter_by(**lookup).first()
+    return obj
+
+
+def get_or_create_media_bulk(keys):
+    """
+    Get or create Media rows for many ``(tmdb_id, media_type)`` keys in one
+    statement. Returns ``{(tmdb_id, media_type): Media}``.
+    """
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+
+    now = datetime.utcnow()
+    rows = [
+        {"tmdb_id": tmdb_id, "media_type": media_type, "created_at": now}
+        for tmdb_id, media_type in keys
+    ]
+    media_rows = _upsert_returning(Media, rows, ["tmdb_id", "media_type"])
+    if media_rows is None:
+        media_rows = [
+            _get_or_create_fallback(Media, {"tmdb_id": t, "media_type": m}, {})
+            for t, m in keys
+        ]
+    return {(m.tmdb_id, m.media_type): m for m in media_rows}
+
 
 def get_or_create_media(tmdb_id, media_type):
     """Get existing media or create if it doesn't exist"""
-    media = Media.query.filter_by(tmdb_id=tmdb_id, media_type=media_type).first()
-    if not media:
-        media = Media(tmdb_id=tmdb_id, media_type=media_type)
-        db.session.add(media)
-        db.session.flush()  # Get ID without committing
-    return media
+    return get_or_create_media_bulk([(tmdb_id, media_type)])[(tmdb_id, media_type)]
+
+
+def get_or_create_user_ratings_bulk(pairs):
+    """
+    Get or create blank ratings for many ``(user_id, media_id)`` pairs in one
+    statement. Existing ratings are left untouched.
+    Returns ``{(user_id, media_id): UserMediaRating}``.
+    """
+    pairs = list(dict.fromkeys(pairs))
+    if not pairs:
+        return {}
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "user_id": user_id,
+            "media_id": media_id,
+            "watch_status": "not_watched",
+            "rating": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for user_id, media_id in pairs
+    ]
+    ratings = _upsert_returning(UserMediaRating, rows, ["user_id", "media_id"])
+    if ratings is None:
+        ratings = [
+            _get_or_create_fallback(
+                UserMediaRating,
+                {"user_id": u, "media_id": m},
+                {"watch_status": "not_watched", "rating": None},
+            )
+            for u, m in pairs
+        ]
+    return {(r.user_id, r.media_id): r for r in ratings}
+
 
 def get_or_create_user_rating(user_id, media_id):
     """Get existing rating or create a blank one"""
-    rating = UserMediaRating.query.filter_by(
-        user_id=user_id, media_id=media_id
-    ).first()
-    
-    if not rating:
-        rating = UserMediaRating(
-            user_id=user_id,
-            media_id=media_id,
-            watch_status="not_watched",
-            rating=None
+    return get_or_create_user_ratings_bulk([(user_id, media_id)])[(user_id, media_id)]
+
+def list_member_ids_query(list_id):
+    """SELECT of every user ID with access to a list (owner + shared users)."""
+    return union(
+        db.select(MediaList.owner_id.label("user_id")).where(MediaList.id == list_id),
+        db.select(SharedList.user_id).where(SharedList.list_id == list_id),
+    )
+
+
+def create_missing_ratings(user_ids, media_ids):
+    """
+    Insert a blank rating for every (user, media) pair that doesn't have one.
+
+    ``user_ids`` / ``media_ids`` may be lists or SELECTs of IDs. The missing
+    pairs are found with one anti-join and inserted by the same statement;
+    ON CONFLICT DO NOTHING skips any pair a concurrent request created in
+    the meantime. Returns the number of ratings created.
+    """
+    now = datetime.utcnow()
+    missing = (
+        db.select(User.id, Media.id, literal("not_watched"), literal(now), literal(now))
+        .join(Media, true())
+        .where(
+            User.id.in_(user_ids),
+            Media.id.in_(media_ids),
+            ~db.select(UserMediaRating.id).where(
+                UserMediaRating.user_id == User.id,
+                UserMediaRating.media_id == Media.id,
+            ).exists(),
         )
-        db.session.add(rating)
-        db.session.flush()  # Get ID without committing
-    
-    return rating
+    )
+    insert = _upsert_insert(UserMediaRating)
+    stmt = (insert if insert is not None else db.insert(UserMediaRating)).from_select(
+        ["user_id", "media_id", "watch_status", "created_at", "updated_at"], missing
+    )
+    if insert is not None:
+        stmt = stmt.on_conflict_do_nothing(index_elements=["user_id", "media_id"])
+    return db.session.execute(stmt).rowcount
 
 def update_user_rating(user_id, media_id, watch_status=None, rating=None):
     """Update a user's rating for a specific media item"""
@@ -55,6 +218,13 @@ def update_user_rating(user_id, media_id, watch_status=None, rating=None):
         user_rating.rating = None
     
     user_rating.updated_at = datetime.utcnow()
+
+    # Every list holding this title that the user belongs to now shows different stats
+    entries = db.select(MediaInList.list_id, MediaInList.id).where(
+        MediaInList.media_id == media_id, MediaInList.list_id.in_(user_list_ids_query(user_id))
+    )
+    bump_list_versions(entries.with_only_columns(MediaInList.list_id))
+    record_changes(ITEM, entries)
     return user_rating
 
 def get_average_rating(media_id, list_id=None):
@@ -62,42 +232,135 @@ def get_average_rating(media_id, list_id=None):
     Get the average rating for a media item
     If list_id is provided, only include ratings from users with access to that list
     """
-    if list_id:
-        # Subquery to get users with access to this list (owner + shared users)
-        query = db.session.query(
-            func.avg(UserMediaRating.rating).label('avg_rating'),
-            func.count(UserMediaRating.id).label('rating_count')
-        ).filter(
-            UserMediaRating.media_id == media_id,
-            UserMediaRating.rating != None
+    avg_rating, count = get_rating_summary(media_id, list_id)
+    avg_rating = float(avg_rating) if avg_rating else None
+    
+    return {'average': avg_rating, 'count': count}
+
+def list_rankings(list_id, prior_weight, min_count=1):
+    """
+    Subquery of per-title rating stats among a list's members, with a
+    Bayesian-weighted ``score``::
+
+        score = (prior_weight * list_mean + sum(ratings)) / (prior_weight + count)
+
+    so a title with a couple of ratings is pulled towards the list-wide mean
+    instead of outranking one with dozens. Columns: ``media_id``,
+    ``average``, ``rating_count``, ``score``.
+    """
+    rated = (
+        db.select(MediaInList.media_id, UserMediaRating.rating)
+        .join(UserMediaRating, UserMediaRating.media_id == MediaInList.media_id)
+        .where(
+            MediaInList.list_id == list_id,
+            UserMediaRating.rating.is_not(None),
+            UserMediaRating.user_id.in_(list_member_ids_query(list_id)),
         )
-        
-        # Join with a subquery for users with access to this list
-        from models import MediaList, SharedList
-        list_users = db.session.query(SharedList.user_id).filter(SharedList.list_id == list_id).subquery()
-        list_owner = db.session.query(MediaList.owner_id).filter(MediaList.id == list_id).subquery()
-        
-        query = query.filter(
-            db.or_(
-                UserMediaRating.user_id.in_(list_users),
-                UserMediaRating.user_id.in_(list_owner)
-            )
+        .cte("rated")
+    )
+    list_mean = db.select(func.avg(rated.c.rating)).scalar_subquery()
+    rating_count = func.count(rated.c.rating)
+    prior_weight = float(prior_weight)
+
+    return (
+        db.select(
+            rated.c.media_id,
+            func.avg(rated.c.rating).label("average"),
+            rating_count.label("rating_count"),
+            ((prior_weight * list_mean + func.sum(rated.c.rating)) / (prior_weight + rating_count)).label("score"),
         )
-    else:
-        # Get global average across all users
-        query = db.session.query(
-            func.avg(UserMediaRating.rating).label('avg_rating'),
-            func.count(UserMediaRating.id).label('rating_count')
-        ).filter(
-            UserMediaRating.media_id == media_id,
-            UserMediaRating.rating != None
+        .group_by(rated.c.media_id)
+        .having(rating_count >= min_count)
+        .subquery("rankings")
+    )
+
+def _empty_distribution():
+    return {
+        "histogram": [0] * 10,
+        "rating_count": 0,
+        "average": None,
+        "watch_status": dict.fromkeys(WATCH_STATUSES, 0),
+    }
+
+
+def _finish_distribution(dist, unrated_members):
+    total = sum(rating * n for rating, n in enumerate(dist["histogram"], start=1))
+    dist["average"] = round(total / dist["rating_count"], 2) if dist["rating_count"] else None
+    # Members with no rating row yet haven't started the title
+    dist["watch_status"]["not_watched"] += unrated_members
+    return dist
+
+
+def _compute_rating_distribution(list_id, member_count):
+    rows = (
+        db.session.query(
+            MediaInList.id,
+            MediaInList.media_id,
+            Media.tmdb_id,
+            Media.media_type,
+            UserMediaRating.watch_status,
+            UserMediaRating.rating,
+            func.count(UserMediaRating.id),
         )
-    
-    result = query.first()
-    avg_rating = float(result.avg_rating) if result.avg_rating else None
-    count = result.rating_count
-    
-    return {'average': avg_rating, 'count': count}
+        .join(Media, Media.id == MediaInList.media_id)
+        .outerjoin(UserMediaRating, (UserMediaRating.media_id == MediaInList.media_id)
+                   & UserMediaRating.user_id.in_(list_member_ids_query(list_id)))
+        .filter(MediaInList.list_id == list_id)
+        .group_by(MediaInList.id, Media.id, UserMediaRating.watch_status, UserMediaRating.rating)
+        .order_by(MediaInList.id)
+        .all()
+    )
+
+    items = {}
+    seen = {}
+    overall = _empty_distribution()
+    for entry_id, media_id, tmdb_id, media_type, watch_status, rating, n in rows:
+        item = items.get(entry_id)
+        if item is None:
+            item = items[entry_id] = {"id": entry_id, "media_id": media_id, "tmdb_id": tmdb_id,
+                                      "media_type": media_type, **_empty_distribution()}
+            seen[entry_id] = 0
+        if not n:
+            continue  # no member has a rating row for this item
+        seen[entry_id] += n
+        for dist in (item, overall):
+            dist["watch_status"][watch_status] = dist["watch_status"].get(watch_status, 0) + n
+            if rating is not None and 1 <= rating <= 10:
+                dist["histogram"][rating - 1] += n
+                dist["rating_count"] += n
+
+    for entry_id, item in items.items():
+        _finish_distribution(item, max(member_count - seen[entry_id], 0))
+    _finish_distribution(overall, sum(max(member_count - n, 0) for n in seen.values()))
+    return {"overall": overall, "items": list(items.values())}
+
+
+def get_rating_distribution(list_id, version, member_count):
+    """
+    Per-item and whole-list histograms of 1-10 ratings plus watch-status
+    counts across the list's members, from one grouped query.
+    Cached per list until ``version`` changes.
+    """
+    with _distribution_lock:
+        cached = _distribution_cache.get(list_id)
+        if cached is not None and cached[0] == version:
+            _distribution_cache.move_to_end(list_id)
+            return cached[1]
+
+    distribution = _compute_rating_distribution(list_id, member_count)
+    with _distribution_lock:
+        _distribution_cache[list_id] = (version, distribution)
+        _distribution_cache.move_to_end(list_id)
+        while len(_distribution_cache) > DISTRIBUTION_CACHE_SIZE:
+            _distribution_cache.popitem(last=False)
+    return distribution
+
+
+def drop_rating_distribution(list_id):
+    """Forget a deleted list's cached distribution."""
+    with _distribution_lock:
+        _distribution_cache.pop(list_id, None)
+
 
 def get_user_ratings_for_list(user_id, list_id):
     """Get a user's ratings for all media in a specific list"""
@@ -114,15 +377,8 @@ def get_user_ratings_for_list(user_id, list_id):
 
 def get_all_ratings_for_media_in_list(list_id, media_id):
     """Get all user ratings for a specific media item in a list"""
-    # Find users with access to the list
-    from models import User, MediaList, SharedList
-    
-    # Get the list owner and shared users
-    list_owner_id = db.session.query(MediaList.owner_id).filter(MediaList.id == list_id).scalar()
-    shared_user_ids = db.session.query(SharedList.user_id).filter(SharedList.list_id == list_id).all()
-    shared_user_ids = [user_id for (user_id,) in shared_user_ids]
-    
-    all_user_ids = [list_owner_id] + shared_user_ids
+    # Find users with access to the list (owner + shared users)
+    all_user_ids = get_list_member_ids(list_id)
     
     # Get ratings from these users
     ratings = db.session.query(
@@ -146,41 +402,44 @@ def get_all_ratings_for_media_in_list(list_id, media_id):
         for rating, username in ratings
     ]
 
-def clean_orphaned_ratings(user_id, media_id):
+def clean_orphaned_ratings_bulk(user_ids, media_ids):
     """
-    Delete a user's rating for a media item if it's no longer in any of their lists.
-    Returns True if deleted, False if kept.
+    Delete every rating for ``user_ids`` x ``media_ids`` whose media is no
+    longer in any list the user owns or is shared into.
+
+    Runs as one anti-join DELETE and returns the number of ratings deleted.
     """
-    # Check if the media exists in any list the user has access to
-    # First, check user's owned lists
-    owned_list_with_media = db.session.query(MediaInList).join(
-        MediaList, MediaList.id == MediaInList.list_id
-    ).filter(
-        MediaList.owner_id == user_id,
-        MediaInList.media_id == media_id
-    ).first()
-    
-    if owned_list_with_media:
-        return False  # Media is in user's owned list, keep the rating
-    
-    # Then check shared lists
-    shared_list_with_media = db.session.query(MediaInList).join(
-        SharedList, SharedList.list_id == MediaInList.list_id
-    ).filter(
-        SharedList.user_id == user_id,
-        MediaInList.media_id == media_id
-    ).first()
-    
-    if shared_list_with_media:
-        return False  # Media is in a shared list, keep the rating
-    
-    # If media isn't in any of the user's lists, delete the rating
-    user_rating = UserMediaRating.query.filter_by(
-        user_id=user_id, media_id=media_id
-    ).first()
-    
-    if user_rating:
-        db.session.delete(user_rating)
-        return True  # Rating was deleted
-    
-    return False  # No rating found to delete
\ No newline at end of file
+    user_ids, media_ids = list(user_ids), list(media_ids)
+    if not user_ids or not media_ids:
+        return 0
+
+    still_in_owned_list = (
+        db.select(MediaInList.id)
+        .join(MediaList, MediaList.id == MediaInList.list_id)
+        .where(
+            MediaInList.media_id == UserMediaRating.media_id,
+            MediaList.owner_id == UserMediaRating.user_id,
+        )
+        .exists()
+    )
+    still_in_shared_list = (
+        db.select(MediaInList.id)
+        .join(SharedList, SharedList.list_id == MediaInList.list_id)
+        .where(
+            MediaInList.media_id == UserMediaRating.media_id,
+            SharedList.user_id == UserMediaRating.user_id,
+        )
+        .exists()
+    )
+
+    result = db.session.execute(
+        db.delete(UserMediaRating)
+        .where(
+            UserMediaRating.user_id.in_(user_ids),
+            UserMediaRating.media_id.in_(media_ids),
+            ~still_in_owned_list,
+            ~still_in_shared_list,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
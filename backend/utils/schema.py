@@ -0,0 +1,222 @@
+"""
+Lightweight, additive schema upgrades.
+
+``db.create_all()`` only creates missing tables, so columns and indexes added
+to an existing model never reach a database created by an older release.
+``upgrade_schema`` fills that gap without a full migration tool: missing
+columns are added (with their server default) and missing indexes are
+created. Nothing is ever dropped or altered, with one exception:
+``rebuild_stale_tables`` rebuilds SQLite tables whose foreign keys predate
+their ``ON DELETE`` action or that lack a declared ``AUTOINCREMENT``, since
+SQLite cannot alter either in place.
+
+``ensure_schema`` wraps all start-up DDL behind a fingerprint of the
+models stored in ``schema_version``, so a boot against a current database
+costs one indexed SELECT instead of reflecting every table.
+"""
+import hashlib
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import inspect
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from extensions import db
+from models import ListChange, SchemaVersion
+from utils.helpers import check_counters
+from utils.activity import backfill_activity
+from utils.changes import reseed_change_ids
+
+
+def upgrade_schema():
+    """
+    Bring existing tables up to date with the models.
+    Returns a list of ``"table.column"`` names that were added.
+    """
+    added = []
+    engine = db.engine
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        ddl_compiler = conn.dialect.ddl_compiler(conn.dialect, None)
+
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue  # create_all() has just built it in full
+
+            existing_cols = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_cols:
+                    continue
+                if not column.nullable and column.server_default is None:
+                    current_app.logger.warning(
+                        f"Cannot add NOT NULL column {table.name}.{column.name} without a server default"
+                    )
+                    continue
+                spec = ddl_compiler.get_column_specification(column)
+                conn.exec_driver_sql(
+                    f"ALTER TABLE {ddl_compiler.preparer.format_table(table)} ADD COLUMN {spec}"
+                )
+                added.append(f"{table.name}.{column.name}")
+
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+    if added:
+        current_app.logger.info(f"Schema upgraded, added columns: {', '.join(added)}")
+    return added
+
+
+def _foreign_keys_stale(inspector, table):
+    """True when a declared ON DELETE action is missing from the live table."""
+    live = {
+        (tuple(fk["constrained_columns"]), fk["referred_table"]): (fk.get("options") or {}).get("ondelete")
+        for fk in inspector.get_foreign_keys(table.name)
+    }
+    for fk in table.foreign_key_constraints:
+        key = (tuple(c.name for c in fk.columns), fk.referred_table.name)
+        if (fk.ondelete or "").upper() != (live.get(key) or "").upper():
+            return True
+    return False
+
+
+def _autoincrement_stale(conn, table):
+    """True when the model asks for AUTOINCREMENT but the live table lacks it."""
+    if not table.dialect_options["sqlite"]["autoincrement"]:
+        return False
+    sql = conn.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,)
+    ).scalar()
+    return "AUTOINCREMENT" not in (sql or "").upper()
+
+
+def rebuild_stale_tables():
+    """
+    Rebuild SQLite tables whose foreign keys lack the declared ON DELETE
+    action, or that lack a declared AUTOINCREMENT (create, copy, drop,
+    rename - SQLite's documented procedure). Rows already orphaned are
+    removed, since enforcement would reject them.
+    Returns the list of rebuilt table names.
+    """
+    engine = db.engine
+    if engine.dialect.name != "sqlite":
+        # Other backends enforce constraints already; change them with the
+        # database's own migration tooling
+        return []
+
+    inspector = inspect(engine)
+    with engine.connect() as check:
+        stale = [
+            table for table in db.metadata.sorted_tables
+            if inspector.has_table(table.name)
+            and (_foreign_keys_stale(inspector, table) or _autoincrement_stale(check, table))
+        ]
+    if not stale:
+        return []
+
+    preparer = engine.dialect.identifier_preparer
+    raw = engine.raw_connection()
+    conn = raw.driver_connection
+    isolation_level = conn.isolation_level
+    orphans = 0
+    try:
+        # The pragma is a no-op inside a transaction, and the rebuild must be
+        # one transaction, so drive BEGIN / COMMIT by hand
+        conn.isolation_level = None
+        conn.execute("PRAGMA foreign_keys=OFF")
+        conn.execute("BEGIN")
+        try:
+            for table in stale:
+                name = preparer.format_table(table)
+                temp = preparer.quote(f"{table.name}__rebuild")
+                live_cols = {c["name"] for c in inspector.get_columns(table.name)}
+                cols = ", ".join(preparer.quote(c.name) for c in table.columns if c.name in live_cols)
+
+                ddl = str(CreateTable(table).compile(dialect=engine.dialect)).strip()
+                conn.execute(ddl.replace(f"CREATE TABLE {name}", f"CREATE TABLE {temp}", 1))
+                conn.execute(f"INSERT INTO {temp} ({cols}) SELECT {cols} FROM {name}")
+                conn.execute(f"DROP TABLE {name}")
+                conn.execute(f"ALTER TABLE {temp} RENAME TO {name}")
+                for index in table.indexes:
+                    conn.execute(str(CreateIndex(index).compile(dialect=engine.dialect)))
+
+            # Deleting an orphan can orphan its own children, so repeat until clean
+            while True:
+                violations = conn.execute("PRAGMA foreign_key_check").fetchall()
+                if not violations:
+                    break
+                for table_name, rowid, _parent, _fkid in violations:
+                    conn.execute(f"DELETE FROM {preparer.quote(table_name)} WHERE rowid = ?", (rowid,))
+                    orphans += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.isolation_level = isolation_level
+        raw.close()
+
+    rebuilt = [table.name for table in stale]
+    current_app.logger.info(
+        f"Rebuilt stale tables: {', '.join(rebuilt)} ({orphans} orphaned rows removed)"
+    )
+    return rebuilt
+
+
+def schema_fingerprint():
+    """Stable hash of every table, column and index the models declare."""
+    digest = hashlib.sha256()
+    for table in db.metadata.sorted_tables:
+        digest.update(table.name.encode())
+        for column in table.columns:
+            default = column.server_default.arg if column.server_default is not None else None
+            digest.update(f"|{column.name}:{column.type}:{column.nullable}:{default}".encode())
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            digest.update(f"|{index.name}:{[c.name for c in index.columns]}:{index.unique}".encode())
+        for fk in sorted(table.foreign_keys, key=lambda f: f.parent.name):
+            digest.update(f"|fk:{fk.parent.name}:{fk.target_fullname}:{fk.ondelete}".encode())
+        digest.update(f"|autoincrement:{table.dialect_options['sqlite']['autoincrement']}".encode())
+    return digest.hexdigest()
+
+
+def _stored_fingerprint():
+    try:
+        return db.session.execute(
+            db.select(SchemaVersion.fingerprint).where(SchemaVersion.id == 1)
+        ).scalar()
+    except SQLAlchemyError:
+        # Fresh database (or one older than schema_version)
+        db.session.rollback()
+        return None
+
+
+def ensure_schema(force=False):
+    """
+    Create / upgrade the schema if the models changed since it was last
+    applied. Returns True when DDL ran, False when the database was current.
+    """
+    fingerprint = schema_fingerprint()
+    if not force and _stored_fingerprint() == fingerprint:
+        return False
+
+    had_activity_log = inspect(db.engine).has_table("activity_event")
+    db.create_all()
+    # Columns added to existing tables start at their server default, and a
+    # table rebuild drops orphaned rows, so recount after either
+    added = upgrade_schema()
+    rebuilt = rebuild_stale_tables()
+    if added or rebuilt:
+        check_counters(fix=True)
+    if ListChange.__tablename__ in rebuilt:
+        reseed_change_ids()
+    # Seed the feeds' event log the first time it is created
+    if not had_activity_log:
+        backfill_activity()
+
+    db.session.merge(SchemaVersion(id=1, fingerprint=fingerprint, applied_at=datetime.utcnow()))
+    db.session.commit()
+    current_app.logger.info(f"Schema brought up to date ({fingerprint[:12]})")
+    return True
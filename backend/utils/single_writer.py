@@ -0,0 +1,167 @@
+"""
+Opt-in single-writer queue for SQLite.
+
+SQLite lets one connection write at a time. Under a threaded server,
+concurrent commits from the list routes queue up on the file lock, and any
+that wait longer than the busy timeout fail with "database is locked".
+
+With SINGLE_WRITER enabled, views marked ``@write_unit`` don't run on the
+request thread. The request is handed to one writer thread, which takes
+everything queued so far as a batch. It runs each view inside its own
+SAVEPOINT and then commits the batch once. Each waiting request gets its
+view's response only after that commit, or the commit's error if it failed.
+
+Inside a unit, ``db.session.commit()`` only flushes and
+``db.session.rollback()`` only discards the unit's own savepoint (see
+RoutingSession), so the views themselves are unchanged. The queue is per
+process, so several worker processes still have one writer each.
+"""
+import logging
+import queue
+import threading
+from contextlib import nullcontext
+from functools import wraps
+
+from flask import g
+from flask.globals import request_ctx
+from sqlalchemy import text
+
+from extensions import db
+from utils.db_routing import WRITE_UNIT_KEY
+
+logger = logging.getLogger(__name__)
+
+
+class _Unit:
+    __slots__ = ("ctx", "view", "args", "kwargs", "done", "result", "error", "savepoint")
+
+    def __init__(self, ctx, view, args, kwargs):
+        self.ctx = ctx
+        self.view = view
+        self.args = args
+        self.kwargs = kwargs
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.savepoint = None
+
+    def rollback(self, session):
+        """Undo this unit's writes and keep going in a fresh savepoint."""
+        self.savepoint.rollback()
+        self.savepoint = session.begin_nested()
+
+
+class SingleWriter:
+    def __init__(self):
+        self.enabled = False
+        self.batch_max = 64
+        self._app = None
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.batches = 0  # group commits so far, for the benchmark / logs
+
+    def on_writer_thread(self):
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, view, args, kwargs):
+        """Run ``view`` on the writer thread and return its response once committed."""
+        return self._wait(_Unit(request_ctx.copy(), view, args, kwargs))
+
+    def call(self, fn, *args, **kwargs):
+        """Run ``fn`` as a unit outside any request (background jobs); returns once committed."""
+        if self.on_writer_thread():
+            return fn(*args, **kwargs)
+        return self._wait(_Unit(None, fn, args, kwargs))
+
+    def _wait(self, unit):
+        self._start()
+        self._queue.put(unit)
+        unit.done.wait()
+        if unit.error is not None:
+            raise unit.error
+        return unit.result
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="single-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Group commit: whatever queued up during the last commit goes together
+            while len(batch) < self.batch_max:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._run_batch(batch)
+            finally:
+                for unit in batch:
+                    unit.done.set()
+
+    def _run_batch(self, batch):
+        with self._app.app_context():
+            session = db.session()
+            try:
+                if db.engine.dialect.name == "sqlite":
+                    # Take the write lock up front; the per-unit savepoints nest inside
+                    session.execute(text("BEGIN IMMEDIATE"))
+                for unit in batch:
+                    self._run_unit(session, unit)
+                session.commit()
+                self.batches += 1
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Single-writer batch of {len(batch)} failed to commit: {e}")
+                for unit in batch:
+                    unit.result, unit.error = None, e
+
+    def _run_unit(self, session, unit):
+        # The copied request context reuses the batch's app context, and with
+        # it the batch's session; only ``g`` has to be reset between views.
+        # Background units have no request and run in the app context as is.
+        unit.savepoint = session.begin_nested()
+        session.info[WRITE_UNIT_KEY] = unit
+        try:
+            with unit.ctx if unit.ctx is not None else nullcontext():
+                vars(g._get_current_object()).clear()
+                unit.result = unit.view(*unit.args, **unit.kwargs)
+            unit.savepoint.commit()
+        except Exception as e:
+            unit.error = e
+            unit.savepoint.rollback()
+        finally:
+            session.info.pop(WRITE_UNIT_KEY, None)
+
+
+single_writer = SingleWriter()
+
+
+def write_unit(view):
+    """
+    Mark a view whose writes go through the single writer when it is enabled.
+    Place it above ``@jwt_required`` so the whole view, auth included, runs there.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not single_writer.enabled or single_writer.on_writer_thread():
+            return view(*args, **kwargs)
+        return single_writer.submit(view, args, kwargs)
+    return wrapper
+
+
+def register_single_writer(app):
+    if not app.config.get("SINGLE_WRITER"):
+        return
+    single_writer.enabled = True
+    single_writer.batch_max = app.config["SINGLE_WRITER_BATCH_MAX"]
+    single_writer._app = app
+    with app.app_context():
+        if db.engine.dialect.name == "sqlite":
+            # Readers keep going while the writer holds the lock
+            db.session.execute(text("PRAGMA journal_mode=WAL"))
+            db.session.commit()
@@ -0,0 +1,139 @@
+"""
+Opt-in slow-query recorder.
+
+Any statement slower than SLOW_QUERY_MS is logged with its parameter
+shape, the endpoint that issued it and, on SQLite, its
+``EXPLAIN QUERY PLAN``. The slowest SLOW_QUERY_TOP_N statement shapes are
+kept in memory for ``GET /api/admin/slow-queries``.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+
+from flask import request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.query_stats import statement_shape
+
+logger = logging.getLogger(__name__)
+
+
+def parameter_shape(parameters, executemany=False):
+    """Describe bound parameters by type, e.g. ``['int', 'str*3']``."""
+    if executemany:
+        rows = list(parameters or [])
+        return {"rows": len(rows), "row": parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+
+    shape = []
+    for value in parameters or ():
+        name = type(value).__name__
+        if shape and shape[-1][0] == name:
+            shape[-1][1] += 1
+        else:
+            shape.append([name, 1])
+    return [name if count == 1 else f"{name}*{count}" for name, count in shape]
+
+
+def explain_query_plan(conn, statement, parameters):
+    """Return SQLite's query plan lines, or None on other backends."""
+    if conn.dialect.name != "sqlite" or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    # Raw DBAPI cursor so the EXPLAIN itself isn't timed or recorded
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as e:
+        return [f"EXPLAIN failed: {e}"]
+    finally:
+        cursor.close()
+
+
+class SlowQueryLog:
+    """Rolling top-N of the slowest statement shapes seen since start-up."""
+
+    def __init__(self, top_n=50):
+        self.top_n = top_n
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def record(self, shape, duration_ms, make_entry):
+        with self._lock:
+            entry = self._entries.get(shape)
+            if entry is not None:
+                entry["count"] += 1
+                entry["total_ms"] += duration_ms
+                if duration_ms <= entry["max_ms"]:
+                    return
+            elif len(self._entries) >= self.top_n:
+                fastest = min(self._entries, key=lambda s: self._entries[s]["max_ms"])
+                if self._entries[fastest]["max_ms"] >= duration_ms:
+                    return
+                del self._entries[fastest]
+
+            # New shape, or a new worst case for a known one
+            details = make_entry()
+            details.update(
+                count=entry["count"] if entry else 1,
+                total_ms=entry["total_ms"] if entry else duration_ms,
+                max_ms=duration_ms,
+            )
+            self._entries[shape] = details
+
+    def snapshot(self):
+        with self._lock:
+            entries = [dict(entry, shape=shape) for shape, entry in self._entries.items()]
+        return sorted(entries, key=lambda e: e["max_ms"], reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog()
+_threshold_ms = None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _threshold_ms is not None:
+        conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("slow_query_started")
+    if not started:
+        return
+    duration_ms = (time.perf_counter() - started.pop()) * 1000
+    if _threshold_ms is None or duration_ms < _threshold_ms:
+        return
+
+    endpoint = request.endpoint if has_request_context() else None
+    params = parameter_shape(parameters, executemany)
+    plan = None if executemany else explain_query_plan(conn, statement, parameters)
+    logger.warning(
+        f"Slow query ({duration_ms:.1f}ms) in {endpoint}: {statement[:300]} "
+        f"params={params} plan={plan}"
+    )
+    slow_query_log.record(statement_shape(statement), duration_ms, lambda: {
+        "statement": statement,
+        "parameters": params,
+        "endpoint": endpoint,
+        "query_plan": plan,
+        "recorded_at": datetime.utcnow().isoformat(),
+    })
+
+
+def register_slow_query_log(app):
+    global _threshold_ms
+    if app.config.get("SLOW_QUERY_MS") is None:
+        return
+    _threshold_ms = app.config["SLOW_QUERY_MS"]
+    slow_query_log.top_n = app.config.get("SLOW_QUERY_TOP_N", 50)
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
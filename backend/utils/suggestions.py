@@ -3,18 +3,18 @@ import json
 import logging
 import requests
 from typing import Dict, List, Tuple, Any, Optional
-from rapidfuzz import fuzz
-from dotenv import load_dotenv
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+# Logging and .env are configured by the app (config.py); importing this
+# module must not reconfigure either. Only a standalone run sets them up.
+if __name__ == "__main__":
+    from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+    load_dotenv()
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+logger = logging.getLogger(__name__)
 
 # Constants
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
@@ -213,6 +213,8 @@ def get_suggestions(
                 search_data = response.json()
                 
                 # Find best match using fuzzy matching
+                from rapidfuzz import fuzz  # deferred: only this endpoint needs it
+
                 best_match = None
                 highest_ratio = 0
                 